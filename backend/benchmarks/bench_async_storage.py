@@ -0,0 +1,114 @@
+"""
+Benchmark: request latency under concurrent load, blocking vs async storage.
+
+Simulates a storage round trip of --latency-ms behind GET /api/stores/{id}.
+The "blocking" engine sleeps the thread, which is what the synchronous
+azure-cosmos client did inside our async handlers; the "async" engine awaits,
+which is what the azure.cosmos.aio engine does now.
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_storage --requests 500 --concurrency 50
+"""
+import argparse
+import asyncio
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from main import app
+from infrastructure.storage_engine import StorageEngine, set_storage_engine
+
+STORE_ID = str(uuid.uuid4())
+STORE = {
+    "id": STORE_ID,
+    "name": "Benchmark Store",
+    "btc_address": "bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh",
+    "verified": True,
+    "created_at": "2024-01-01T00:00:00Z",
+    "updated_at": "2024-01-01T00:00:00Z",
+}
+
+
+class BlockingLatencyEngine(StorageEngine):
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def get_store(self, store_id: str) -> Optional[Dict]:
+        time.sleep(self.latency)
+        return dict(STORE)
+
+
+class AsyncLatencyEngine(StorageEngine):
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def get_store(self, store_id: str) -> Optional[Dict]:
+        await asyncio.sleep(self.latency)
+        return dict(STORE)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def start_server(port: int) -> uvicorn.Server:
+    """Serve the app on its own event loop thread, like a single uvicorn worker."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+async def run_load(base_url: str, requests: int, concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(f"/api/stores/{STORE_ID}")
+                latencies.append(time.perf_counter() - started)
+                response.raise_for_status()
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = start_server(args.port)
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    latency = args.latency_ms / 1000
+    print(f"{args.requests} requests, concurrency {args.concurrency}, storage latency {args.latency_ms:.0f} ms")
+    print(f"{'engine':<10}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, engine in (("blocking", BlockingLatencyEngine(latency)), ("async", AsyncLatencyEngine(latency))):
+        set_storage_engine(engine)
+        asyncio.run(run_load(base_url, args.concurrency, args.concurrency))  # warm up
+        started = time.perf_counter()
+        samples = asyncio.run(run_load(base_url, args.requests, args.concurrency))
+        elapsed = time.perf_counter() - started
+        print(f"{name:<10}{percentile(samples, 50) * 1000:>10.1f}{percentile(samples, 99) * 1000:>10.1f}"
+              f"{args.requests / elapsed:>10.0f}")
+    set_storage_engine(None)
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark: mempool-style lookups with a session per request vs the shared pool.
+
+Starts a local stub of GET /tx/{txid} and fetches it the way
+TransactionMonitor used to (new aiohttp.ClientSession, and so a new
+connection, per request) and the way it does now (the shared session from
+infrastructure.http_client). Pass --tls to serve HTTPS with a throwaway
+self-signed certificate (needs the openssl CLI), which is where the
+per-request handshake really hurts.
+
+Usage (from backend/):
+    python -m benchmarks.bench_http_session --requests 500 --concurrency 20 --tls
+"""
+import argparse
+import asyncio
+import os
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from benchmarks.bench_async_storage import percentile
+from infrastructure.http_client import get_http_session, close_http_session
+
+TX = {"txid": "ab" * 32, "status": {"confirmed": True}, "vin": [], "vout": [{"value": 1234}]}
+
+
+async def handle_tx(request: web.Request) -> web.Response:
+    return web.json_response({**TX, "txid": request.match_info["txid"]})
+
+
+def self_signed_context(directory: str) -> ssl.SSLContext:
+    cert, key = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=127.0.0.1", "-keyout", key, "-out", cert],
+        check=True,
+        capture_output=True,
+    )
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+def start_stub(port: int, ssl_context: Optional[ssl.SSLContext]) -> None:
+    """Serve the stub on its own event loop thread so it does not share the client's loop."""
+    app = web.Application()
+    app.router.add_get("/tx/{txid}", handle_tx)
+    started = threading.Event()
+
+    def serve():
+        loop = asyncio.new_event_loop()
+        runner = web.AppRunner(app, access_log=None)
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, "127.0.0.1", port, ssl_context=ssl_context).start())
+        started.set()
+        loop.run_forever()
+
+    threading.Thread(target=serve, daemon=True).start()
+    started.wait()
+
+
+async def fetch_per_request(url: str, client_ssl) -> None:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url, ssl=client_ssl) as response:
+            await response.json()
+
+
+async def fetch_shared(url: str, client_ssl) -> None:
+    async with get_http_session().get(url, ssl=client_ssl) as response:
+        await response.json()
+
+
+async def run_load(fetch, base_url: str, requests: int, concurrency: int, client_ssl) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(index: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await fetch(f"{base_url}/tx/{index:064x}", client_ssl)
+            latencies.append(time.perf_counter() - started)
+
+    try:
+        await asyncio.gather(*(one(i) for i in range(requests)))
+    finally:
+        await close_http_session()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--tls", action="store_true", help="Serve HTTPS with a self-signed certificate")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        server_ssl = self_signed_context(directory) if args.tls else None
+        start_stub(args.port, server_ssl)
+
+    scheme = "https" if args.tls else "http"
+    # The stub's certificate is self-signed; skip verification on the client side
+    client_ssl = False if args.tls else None
+    base_url = f"{scheme}://127.0.0.1:{args.port}"
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {scheme}")
+    print(f"{'session':<14}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}")
+    for name, fetch in (("per-request", fetch_per_request), ("shared", fetch_shared)):
+        asyncio.run(run_load(fetch, base_url, args.concurrency, args.concurrency, client_ssl))  # warm up
+        started = time.perf_counter()
+        samples = asyncio.run(run_load(fetch, base_url, args.requests, args.concurrency, client_ssl))
+        elapsed = time.perf_counter() - started
+        print(f"{name:<14}{percentile(samples, 50) * 1000:>10.2f}{percentile(samples, 99) * 1000:>10.2f}"
+              f"{args.requests / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
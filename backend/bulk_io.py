@@ -0,0 +1,150 @@
+"""
+Stream stores and reviews to and from NDJSON files.
+
+    python bulk_io.py export stores stores.ndjson
+    python bulk_io.py import reviews reviews.ndjson --batch-size 200 --concurrency 32
+
+Both directions hold one batch in memory at a time. They write a
+checkpoint (<file>.<direction>.checkpoint) after every batch, so an
+interrupted run started again with the same arguments picks up where it
+stopped; pass --restart to start over. Imports upsert documents as-is, including store review_stats, so
+importing a full export needs no aggregate rebuild. If reviews are imported
+without their stores, run rebuild_review_stats.py afterwards.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from infrastructure.storage_engine import StorageEngine, get_storage_engine, close_storage_engine
+
+# Load environment variables
+load_dotenv()
+
+# Cosmos system properties are regenerated on write and not worth exporting
+SYSTEM_FIELDS = ("_rid", "_self", "_etag", "_attachments", "_ts")
+
+
+class Progress:
+    def __init__(self, engine: StorageEngine, rows: int = 0, interval: float = 5.0):
+        self.engine = engine
+        self.rows = rows
+        self.interval = interval
+        self.started = time.monotonic()
+        self.start_rows = rows
+        self.start_charge = engine.request_charge
+        self._last_report = self.started
+
+    def add(self, count: int) -> None:
+        self.rows += count
+        if time.monotonic() - self._last_report >= self.interval:
+            self.report()
+
+    def report(self, final: bool = False) -> None:
+        self._last_report = time.monotonic()
+        elapsed = max(self._last_report - self.started, 1e-9)
+        rate = (self.rows - self.start_rows) / elapsed
+        charge = self.engine.request_charge - self.start_charge
+        label = "Done" if final else "Progress"
+        print(f"{label}: {self.rows} rows, {rate:.0f} rows/sec, {charge:.1f} RU in {elapsed:.1f}s")
+
+
+def load_checkpoint(path: str, restart: bool) -> Dict:
+    if restart or not os.path.exists(path):
+        return {"offset": 0, "rows": 0, "continuation_token": None}
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, checkpoint: Dict) -> None:
+    # Write-then-rename so a crash never leaves a half-written checkpoint
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+async def export_documents(engine: StorageEngine, kind: str, path: str, checkpoint_path: str, batch_size: int, restart: bool) -> int:
+    read_page = engine.read_stores_page if kind == "stores" else engine.read_reviews_page
+    checkpoint = load_checkpoint(checkpoint_path, restart)
+    if checkpoint["offset"] and checkpoint["continuation_token"] is None:
+        print(f"Export of {kind} already complete ({checkpoint['rows']} rows); use --restart to run again")
+        return checkpoint["rows"]
+
+    progress = Progress(engine, checkpoint["rows"])
+    with open(path, "a+b") as out:
+        # Drop anything written after the last checkpoint
+        out.truncate(checkpoint["offset"])
+        out.seek(checkpoint["offset"])
+        token: Optional[str] = checkpoint["continuation_token"]
+        while True:
+            docs, token = await read_page(batch_size, token)
+            for doc in docs:
+                for field in SYSTEM_FIELDS:
+                    doc.pop(field, None)
+                out.write(json.dumps(doc, separators=(",", ":")).encode() + b"\n")
+            out.flush()
+            os.fsync(out.fileno())
+            progress.add(len(docs))
+            save_checkpoint(checkpoint_path, {"offset": out.tell(), "rows": progress.rows, "continuation_token": token})
+            if not token:
+                break
+
+    progress.report(final=True)
+    return progress.rows
+
+
+async def import_documents(engine: StorageEngine, kind: str, path: str, checkpoint_path: str, batch_size: int, concurrency: int, restart: bool) -> int:
+    upsert = engine.upsert_stores if kind == "stores" else engine.upsert_reviews
+    checkpoint = load_checkpoint(checkpoint_path, restart)
+    progress = Progress(engine, checkpoint["rows"])
+
+    with open(path, "rb") as f:
+        f.seek(checkpoint["offset"])
+        batch: List[Dict] = []
+        while True:
+            line = f.readline()
+            if line.strip():
+                batch.append(json.loads(line))
+            if batch and (len(batch) >= batch_size or not line):
+                # Upserts are idempotent, so replaying a batch after a crash is safe
+                await upsert(batch, concurrency)
+                progress.add(len(batch))
+                batch = []
+                save_checkpoint(checkpoint_path, {"offset": f.tell(), "rows": progress.rows, "continuation_token": None})
+            if not line:
+                break
+
+    progress.report(final=True)
+    return progress.rows
+
+
+async def main(args) -> None:
+    engine = get_storage_engine()
+    await engine.open()
+    checkpoint_path = args.checkpoint or f"{args.path}.{args.direction}.checkpoint"
+    try:
+        if args.direction == "export":
+            await export_documents(engine, args.kind, args.path, checkpoint_path, args.batch_size, args.restart)
+        else:
+            await import_documents(
+                engine, args.kind, args.path, checkpoint_path, args.batch_size, args.concurrency, args.restart
+            )
+    finally:
+        await close_storage_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("direction", choices=["export", "import"])
+    parser.add_argument("kind", choices=["stores", "reviews"])
+    parser.add_argument("path", help="NDJSON file to write or read")
+    parser.add_argument("--batch-size", type=int, default=100, help="Documents per page/batch (default 100)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent writes per import batch (default 16)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default <path>.<direction>.checkpoint)")
+    parser.add_argument("--restart", action="store_true", help="Ignore any existing checkpoint")
+    asyncio.run(main(parser.parse_args()))
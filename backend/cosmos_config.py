@@ -32,7 +32,19 @@ def get_config() -> CosmosConfig:
     )
 
 
+@dataclass
+class StorageConfig:
+    engine: str
+    sqlite_path: str
 
 
+def get_storage_config() -> StorageConfig:
+    engine = os.getenv("STORAGE_ENGINE", "cosmos").strip().lower()
 
+    if engine not in ("cosmos", "sqlite"):
+        raise ValueError(f"Unsupported STORAGE_ENGINE '{engine}', expected 'cosmos' or 'sqlite'")
 
+    return StorageConfig(
+        engine=engine,
+        sqlite_path=os.getenv("SQLITE_DB_PATH", "btcapproved.db"),
+    )
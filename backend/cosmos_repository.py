@@ -1,35 +1,71 @@
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Tuple
 from dataclasses import dataclass
-from azure.cosmos import exceptions
-from infrastructure.cosmos_client import get_cosmos_resources
+from infrastructure.storage_engine import get_storage_engine
+from infrastructure.cache import TTLCache
+from infrastructure.review_stats import REVIEW_STATS_FIELD, empty_review_stats
+from infrastructure.review_ids import new_review_id, store_id_from_review_id
+from infrastructure.metrics import metrics
+from infrastructure.storage_metrics import instrumented
+import copy
+import os
 import uuid
 from datetime import datetime, timezone
 
 
+# Read-through cache for store point reads. Writes through this module
+# refresh the entry; the TTL bounds staleness from writes made by other
+# processes.
+store_cache = TTLCache(
+    max_size=int(os.getenv("STORE_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("STORE_CACHE_TTL_SECONDS", "30")),
+)
+metrics.register_collector("store_cache", store_cache.stats)
+
+
 @dataclass
 class SupabaseResponse:
     data: Optional[Union[List[Dict], Dict]] = None
     error: Optional[str] = None
 
 
-def get_stores() -> List[Dict]:
-    _, _, stores_container, _ = get_cosmos_resources()
-    items = list(stores_container.read_all_items())
-    return items
-
-
-def get_store(store_id: str) -> Optional[Dict]:
-    _, _, stores_container, _ = get_cosmos_resources()
-    try:
-        # Partition key is /id for stores
-        item = stores_container.read_item(item=store_id, partition_key=store_id)
-        return item
-    except exceptions.CosmosResourceNotFoundError:
-        return None
-
-
-def create_store(store_data: Dict) -> Optional[Dict]:
-    _, _, stores_container, _ = get_cosmos_resources()
+@instrumented("get_stores")
+async def get_stores() -> List[Dict]:
+    return await get_storage_engine().get_stores()
+
+
+@instrumented("get_store")
+async def get_store(store_id: str) -> Optional[Dict]:
+    cached = store_cache.get(store_id)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
+    generation = store_cache.generation
+    store = await get_storage_engine().get_store(store_id)
+    if store is not None:
+        # Skip caching if a write landed while we were reading
+        store_cache.set_if_unchanged(store_id, copy.deepcopy(store), generation)
+    return store
+
+
+@instrumented("query_stores")
+async def query_stores(
+    category: Optional[str] = None,
+    verified: Optional[bool] = None,
+    limit: int = 10,
+    offset: int = 0,
+    continuation_token: Optional[str] = None,
+) -> Tuple[List[Dict], Optional[str]]:
+    return await get_storage_engine().query_stores(
+        category=category,
+        verified=verified,
+        limit=limit,
+        offset=offset,
+        continuation_token=continuation_token,
+    )
+
+
+@instrumented("create_store")
+async def create_store(store_data: Dict) -> Optional[Dict]:
     # Generate UUID if not provided
     if 'id' not in store_data:
         store_data['id'] = str(uuid.uuid4())
@@ -37,72 +73,82 @@ def create_store(store_data: Dict) -> Optional[Dict]:
     now = datetime.now(timezone.utc).isoformat()
     store_data['created_at'] = now
     store_data['updated_at'] = now
-    created = stores_container.create_item(body=store_data)
+    store_data.setdefault(REVIEW_STATS_FIELD, empty_review_stats())
+    created = await get_storage_engine().create_store(store_data)
+    if created is not None:
+        store_cache.set(created['id'], copy.deepcopy(created))
     return created
 
 
-def update_store(store_id: str, update_data: Dict) -> Optional[Dict]:
-    _, _, stores_container, _ = get_cosmos_resources()
-    try:
-        existing = stores_container.read_item(item=store_id, partition_key=store_id)
-    except exceptions.CosmosResourceNotFoundError:
-        return None
-
+@instrumented("update_store")
+async def update_store(store_id: str, update_data: Dict) -> Optional[Dict]:
     # Merge fields and update timestamp
     update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
-    updated = {**existing, **update_data}
-    replaced = stores_container.replace_item(item=store_id, body=updated)
-    return replaced
+    try:
+        updated = await get_storage_engine().update_store(store_id, update_data)
+    except Exception:
+        store_cache.invalidate(store_id)
+        raise
+    if updated is None:
+        store_cache.invalidate(store_id)
+    else:
+        store_cache.set(store_id, copy.deepcopy(updated))
+    return updated
+
+
+@instrumented("get_reviews")
+async def get_reviews(store_id: Optional[str] = None) -> SupabaseResponse:
+    try:
+        items = await get_storage_engine().get_reviews(store_id)
+        return SupabaseResponse(data=items)
+    except Exception as e:
+        return SupabaseResponse(error=str(e))
 
 
-def get_reviews(store_id: Optional[str] = None) -> SupabaseResponse:
-    _, _, _, reviews_container = get_cosmos_resources()
+@instrumented("get_review")
+async def get_review(review_id: str) -> SupabaseResponse:
     try:
-        if store_id:
-            # Partition key is /store_id for reviews; use query for flexibility
-            query = "SELECT * FROM c WHERE c.store_id = @store_id"
-            params = [{"name": "@store_id", "value": store_id}]
-            items = list(reviews_container.query_items(query=query, parameters=params, enable_cross_partition_query=True))
-            return SupabaseResponse(data=items)
-        # All reviews
-        items = list(reviews_container.read_all_items())
-        return SupabaseResponse(data=items)
+        review = await get_storage_engine().get_review(review_id, store_id_from_review_id(review_id))
+        return SupabaseResponse(data=review)
     except Exception as e:
         return SupabaseResponse(error=str(e))
 
 
-def create_review(review_data: Dict) -> SupabaseResponse:
-    _, _, _, reviews_container = get_cosmos_resources()
+@instrumented("create_review")
+async def create_review(review_data: Dict) -> SupabaseResponse:
     try:
-        # Generate UUID if not provided
+        # Generate an id carrying the store_id partition key if not provided
         if 'id' not in review_data:
-            review_data['id'] = str(uuid.uuid4())
-        created = reviews_container.create_item(body=review_data)
+            review_data['id'] = new_review_id(review_data['store_id'])
+        now = datetime.now(timezone.utc).isoformat()
+        review_data.setdefault('created_at', now)
+        review_data.setdefault('updated_at', now)
+        created = await get_storage_engine().create_review(review_data)
+        # The engine updated the store's review aggregates
+        store_cache.invalidate(review_data.get('store_id'))
         return SupabaseResponse(data=created)
     except Exception as e:
         return SupabaseResponse(error=str(e))
 
 
-def update_review(review_id: str, update_data: Dict) -> SupabaseResponse:
-    _, _, _, reviews_container = get_cosmos_resources()
+@instrumented("update_review")
+async def update_review(review_id: str, update_data: Dict) -> SupabaseResponse:
     try:
-        # Need partition key to read/replace. We assume review contains store_id
-        # Fetch item by id across partitions
-        query = "SELECT * FROM c WHERE c.id = @id"
-        params = [{"name": "@id", "value": review_id}]
-        results = list(reviews_container.query_items(query=query, parameters=params, enable_cross_partition_query=True))
-        if not results:
+        update_data['updated_at'] = datetime.now(timezone.utc).isoformat()
+        updated = await get_storage_engine().update_review(
+            review_id, update_data, store_id_from_review_id(review_id)
+        )
+        if updated is None:
             return SupabaseResponse(error="Review not found")
-        existing = results[0]
-        partition_key = existing.get("store_id")
-        updated = {**existing, **update_data}
-        replaced = reviews_container.replace_item(item=review_id, body=updated, partition_key=partition_key)
-        return SupabaseResponse(data=replaced)
+        store_cache.invalidate(updated.get('store_id'))
+        return SupabaseResponse(data=updated)
     except Exception as e:
         return SupabaseResponse(error=str(e))
 
 
-
-
-
-
+@instrumented("rebuild_review_stats")
+async def rebuild_review_stats(store_id: str) -> Optional[Dict]:
+    """Recompute a store's review aggregates from scratch."""
+    stats = await get_storage_engine().rebuild_review_stats(store_id)
+    store_cache.invalidate(store_id)
+    return stats
@@ -1,5 +1,5 @@
 from typing import Tuple
-from azure.cosmos import CosmosClient
+from azure.cosmos.aio import CosmosClient
 from cosmos_config import get_config
 
 
@@ -24,7 +24,9 @@ def get_cosmos_resources() -> Tuple[CosmosClient, object, object, object]:
     return _client, _db, _stores_container, _reviews_container
 
 
+async def close_cosmos_resources() -> None:
+    global _client, _db, _stores_container, _reviews_container
 
-
-
-
+    if _client is not None:
+        await _client.close()
+    _client = _db = _stores_container = _reviews_container = None
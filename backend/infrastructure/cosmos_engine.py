@@ -0,0 +1,362 @@
+import asyncio
+from typing import Callable, Dict, List, Optional, Tuple
+from azure.core import MatchConditions
+from azure.core.async_paging import AsyncItemPaged
+from azure.cosmos import exceptions
+from infrastructure.cosmos_client import get_cosmos_resources, close_cosmos_resources
+from infrastructure.storage_engine import (
+    StorageEngine,
+    STORE_SEARCH_FIELDS,
+    InvalidContinuationToken,
+    ConcurrentUpdateError,
+)
+from infrastructure.review_stats import REVIEW_STATS_FIELD, compute_review_stats, review_stats_changes
+from infrastructure.cache import TTLCache
+from infrastructure.storage_metrics import record_query, record_request_charge
+
+# Keeps continuation tokens small enough to travel in a response header
+CONTINUATION_TOKEN_LIMIT_KB = 1
+# Cosmos accepts at most 10 operations in one patch request
+MAX_PATCH_OPERATIONS = 10
+# Attempts for an ETag-conditional replace before giving up
+MAX_CONFLICT_RETRIES = 5
+
+
+def _patch_path(field: str) -> str:
+    # JSON Pointer escaping for field names
+    return "/" + field.replace("~", "~0").replace("/", "~1")
+
+
+async def _replace_if_unchanged(
+    container,
+    item_id: str,
+    partition_key: str,
+    read: Callable,
+    update_data: Dict,
+    existing: Optional[Dict] = None,
+    response_hook: Optional[Callable] = None,
+) -> Optional[Tuple[Dict, Dict]]:
+    """
+    Read-merge-replace guarded by the document's _etag.
+
+    If another writer replaced the document in between, the replace fails
+    with 412 and we re-read and merge again, up to MAX_CONFLICT_RETRIES.
+    `existing` may carry a copy the caller already read to skip the first
+    read. Returns (existing, replaced), or None if the document does not exist.
+    """
+    for attempt in range(MAX_CONFLICT_RETRIES):
+        if attempt or existing is None:
+            existing = await read()
+        if existing is None:
+            return None
+        try:
+            record_query(f"replace_item {container.id} if-match")
+            replaced = await container.replace_item(
+                item=item_id,
+                body={**existing, **update_data},
+                partition_key=partition_key,
+                etag=existing["_etag"],
+                match_condition=MatchConditions.IfNotModified,
+                response_hook=response_hook,
+            )
+            return existing, replaced
+        except exceptions.CosmosAccessConditionFailedError:
+            continue
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+    raise ConcurrentUpdateError(f"Gave up updating {item_id} after {MAX_CONFLICT_RETRIES} conflicting writes")
+
+
+class CosmosStorageEngine(StorageEngine):
+    """Azure Cosmos DB engine. Stores are partitioned by /id, reviews by /store_id."""
+
+    def __init__(self):
+        # Partition keys of legacy (bare uuid) review ids. A review never
+        # changes store, so entries only leave through LRU eviction.
+        self._legacy_review_partitions = TTLCache(max_size=10000, ttl=float("inf"))
+
+    def _record_charge(self, headers: Dict, result) -> None:
+        # Feed methods also call the hook once on creation with the previous
+        # request's headers; only the per-page calls carry this request's charge
+        if isinstance(result, AsyncItemPaged):
+            return
+        charge = float(headers.get("x-ms-request-charge", 0) or 0)
+        self.request_charge += charge
+        record_request_charge(charge)
+
+    async def open(self) -> None:
+        get_cosmos_resources()
+
+    async def close(self) -> None:
+        await close_cosmos_resources()
+
+    async def get_stores(self) -> List[Dict]:
+        _, _, stores_container, _ = get_cosmos_resources()
+        record_query("read_all_items stores")
+        return [item async for item in stores_container.read_all_items(response_hook=self._record_charge)]
+
+    async def get_store(self, store_id: str) -> Optional[Dict]:
+        _, _, stores_container, _ = get_cosmos_resources()
+        try:
+            # Partition key is /id for stores
+            record_query("read_item stores")
+            return await stores_container.read_item(
+                item=store_id, partition_key=store_id, response_hook=self._record_charge
+            )
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+
+    async def query_stores(
+        self,
+        category: Optional[str] = None,
+        verified: Optional[bool] = None,
+        limit: int = 10,
+        offset: int = 0,
+        continuation_token: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        _, _, stores_container, _ = get_cosmos_resources()
+        conditions = []
+        params = []
+        if category:
+            conditions.append("c.category = @category")
+            params.append({"name": "@category", "value": category})
+        if verified is not None:
+            conditions.append("c.verified = @verified")
+            params.append({"name": "@verified", "value": verified})
+
+        query = "SELECT " + ", ".join(f"c.{field}" for field in STORE_SEARCH_FIELDS) + " FROM c"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if offset and not continuation_token:
+            query += " OFFSET @offset LIMIT @limit"
+            params += [{"name": "@offset", "value": offset}, {"name": "@limit", "value": limit}]
+
+        record_query(query)
+        items = stores_container.query_items(
+            query=query,
+            parameters=params,
+            max_item_count=limit,
+            continuation_token_limit=CONTINUATION_TOKEN_LIMIT_KB,
+            response_hook=self._record_charge,
+        )
+        pages = items.by_page(continuation_token)
+        try:
+            page = await pages.__anext__()
+            stores = [item async for item in page]
+        except StopAsyncIteration:
+            return [], None
+        except exceptions.CosmosHttpResponseError as e:
+            if continuation_token and e.status_code == 400:
+                raise InvalidContinuationToken("Invalid continuation token") from e
+            raise
+        return stores, pages.continuation_token
+
+    async def create_store(self, store_data: Dict) -> Dict:
+        _, _, stores_container, _ = get_cosmos_resources()
+        record_query("create_item stores")
+        return await stores_container.create_item(body=store_data, response_hook=self._record_charge)
+
+    async def update_store(self, store_id: str, update_data: Dict) -> Optional[Dict]:
+        _, _, stores_container, _ = get_cosmos_resources()
+        if len(update_data) <= MAX_PATCH_OPERATIONS:
+            # One round trip; the server applies the fields to the current
+            # document, so concurrent updates cannot drop each other's fields
+            operations = [
+                {"op": "set", "path": _patch_path(field), "value": value}
+                for field, value in update_data.items()
+            ]
+            try:
+                record_query("patch_item stores")
+                return await stores_container.patch_item(
+                    item=store_id,
+                    partition_key=store_id,
+                    patch_operations=operations,
+                    response_hook=self._record_charge,
+                )
+            except exceptions.CosmosResourceNotFoundError:
+                return None
+
+        result = await _replace_if_unchanged(
+            stores_container,
+            store_id,
+            store_id,
+            lambda: self.get_store(store_id),
+            update_data,
+            response_hook=self._record_charge,
+        )
+        return result[1] if result else None
+
+    async def get_reviews(self, store_id: Optional[str] = None) -> List[Dict]:
+        _, _, _, reviews_container = get_cosmos_resources()
+        if store_id:
+            # Partition key is /store_id for reviews, so this stays in one partition
+            query = "SELECT * FROM c WHERE c.store_id = @store_id"
+            params = [{"name": "@store_id", "value": store_id}]
+            record_query(query)
+            items = reviews_container.query_items(
+                query=query, parameters=params, partition_key=store_id, response_hook=self._record_charge
+            )
+            return [item async for item in items]
+        # All reviews
+        record_query("read_all_items reviews")
+        return [item async for item in reviews_container.read_all_items(response_hook=self._record_charge)]
+
+    async def _apply_review_stats(self, before: Optional[Dict], after: Optional[Dict]) -> None:
+        """
+        Increment store aggregates server-side with patch operations.
+
+        Reviews and stores live in different containers, so this cannot share
+        a transaction with the review write; each patch is atomic on its own
+        and the rebuild command corrects any drift.
+        """
+        _, _, stores_container, _ = get_cosmos_resources()
+        for store_id, delta in review_stats_changes(before, after).items():
+            operations = [
+                {"op": "incr", "path": f"/{REVIEW_STATS_FIELD}/{field}", "value": delta[field]}
+                for field in ("count", "rating_sum", "verified_count")
+                if delta[field]
+            ]
+            operations += [
+                {"op": "incr", "path": f"/{REVIEW_STATS_FIELD}/rating_histogram/{bucket}", "value": value}
+                for bucket, value in delta["rating_histogram"].items()
+            ]
+            try:
+                record_query("patch_item stores review_stats")
+                await stores_container.patch_item(
+                    item=store_id,
+                    partition_key=store_id,
+                    patch_operations=operations,
+                    response_hook=self._record_charge,
+                )
+            except exceptions.CosmosResourceNotFoundError:
+                continue
+            except exceptions.CosmosHttpResponseError as e:
+                # Stores created before aggregates existed have no review_stats
+                # object to increment; build it from the reviews instead
+                if e.status_code != 400:
+                    raise
+                await self.rebuild_review_stats(store_id)
+
+    async def create_review(self, review_data: Dict) -> Dict:
+        _, _, _, reviews_container = get_cosmos_resources()
+        record_query("create_item reviews")
+        created = await reviews_container.create_item(body=review_data, response_hook=self._record_charge)
+        await self._apply_review_stats(None, created)
+        return created
+
+    async def _find_legacy_review(self, review_id: str) -> Optional[Dict]:
+        """Resolve a pre-composite review id with one indexed id lookup."""
+        _, _, _, reviews_container = get_cosmos_resources()
+        store_id = self._legacy_review_partitions.get(review_id)
+        if store_id is not None:
+            return await self._read_review(review_id, store_id)
+
+        query = "SELECT * FROM c WHERE c.id = @id"
+        params = [{"name": "@id", "value": review_id}]
+        record_query(query)
+        items = reviews_container.query_items(query=query, parameters=params, response_hook=self._record_charge)
+        results = [item async for item in items]
+        if not results:
+            return None
+        self._legacy_review_partitions.set(review_id, results[0].get("store_id"))
+        return results[0]
+
+    async def _read_review(self, review_id: str, store_id: str) -> Optional[Dict]:
+        _, _, _, reviews_container = get_cosmos_resources()
+        try:
+            record_query("read_item reviews")
+            return await reviews_container.read_item(
+                item=review_id, partition_key=store_id, response_hook=self._record_charge
+            )
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+
+    async def get_review(self, review_id: str, store_id: Optional[str] = None) -> Optional[Dict]:
+        if store_id:
+            return await self._read_review(review_id, store_id)
+        return await self._find_legacy_review(review_id)
+
+    async def update_review(self, review_id: str, update_data: Dict, store_id: Optional[str] = None) -> Optional[Dict]:
+        _, _, _, reviews_container = get_cosmos_resources()
+        # Aggregates need the review as it was before this write, so this is
+        # a conditional replace rather than a blind patch
+        existing = await self.get_review(review_id, store_id)
+        if existing is None:
+            return None
+        partition_key = existing.get("store_id")
+        result = await _replace_if_unchanged(
+            reviews_container,
+            review_id,
+            partition_key,
+            lambda: self._read_review(review_id, partition_key),
+            update_data,
+            existing=existing,
+            response_hook=self._record_charge,
+        )
+        if result is None:
+            return None
+        before, replaced = result
+        await self._apply_review_stats(before, replaced)
+        return replaced
+
+    async def _read_page(self, container, page_size: int, continuation_token: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+        record_query(f"read_all_items {container.id}")
+        pages = container.read_all_items(max_item_count=page_size, response_hook=self._record_charge).by_page(
+            continuation_token
+        )
+        try:
+            page = await pages.__anext__()
+            items = [item async for item in page]
+        except StopAsyncIteration:
+            return [], None
+        return items, pages.continuation_token
+
+    async def read_stores_page(
+        self, page_size: int, continuation_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        _, _, stores_container, _ = get_cosmos_resources()
+        return await self._read_page(stores_container, page_size, continuation_token)
+
+    async def read_reviews_page(
+        self, page_size: int, continuation_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        _, _, _, reviews_container = get_cosmos_resources()
+        return await self._read_page(reviews_container, page_size, continuation_token)
+
+    async def _upsert_all(self, container, docs: List[Dict], concurrency: int) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def upsert(doc: Dict) -> None:
+            async with semaphore:
+                await container.upsert_item(body=doc, response_hook=self._record_charge)
+
+        await asyncio.gather(*(upsert(doc) for doc in docs))
+
+    async def upsert_stores(self, stores: List[Dict], concurrency: int = 16) -> None:
+        _, _, stores_container, _ = get_cosmos_resources()
+        await self._upsert_all(stores_container, stores, concurrency)
+
+    async def upsert_reviews(self, reviews: List[Dict], concurrency: int = 16) -> None:
+        _, _, _, reviews_container = get_cosmos_resources()
+        await self._upsert_all(reviews_container, reviews, concurrency)
+
+    async def rebuild_review_stats(self, store_id: str) -> Optional[Dict]:
+        _, _, stores_container, reviews_container = get_cosmos_resources()
+        query = "SELECT c.store_id, c.rating, c.verified FROM c WHERE c.store_id = @store_id"
+        params = [{"name": "@store_id", "value": store_id}]
+        record_query(query)
+        items = reviews_container.query_items(
+            query=query, parameters=params, partition_key=store_id, response_hook=self._record_charge
+        )
+        stats = compute_review_stats([item async for item in items])
+        try:
+            record_query("patch_item stores review_stats")
+            await stores_container.patch_item(
+                item=store_id,
+                partition_key=store_id,
+                patch_operations=[{"op": "set", "path": f"/{REVIEW_STATS_FIELD}", "value": stats}],
+                response_hook=self._record_charge,
+            )
+        except exceptions.CosmosResourceNotFoundError:
+            return None
+        return stats
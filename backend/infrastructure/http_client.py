@@ -0,0 +1,47 @@
+import asyncio
+import os
+from typing import Optional
+import aiohttp
+
+# Connection pool for outbound HTTP (mempool.space and friends)
+HTTP_POOL_LIMIT = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+HTTP_POOL_LIMIT_PER_HOST = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+HTTP_KEEPALIVE_SECONDS = float(os.getenv("HTTP_KEEPALIVE_SECONDS", "30"))
+HTTP_DNS_CACHE_SECONDS = int(os.getenv("HTTP_DNS_CACHE_SECONDS", "300"))
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _new_session() -> aiohttp.ClientSession:
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_LIMIT,
+        limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+        keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+        ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Return the process-wide ClientSession, creating it on first use.
+
+    Reusing one session keeps TCP/TLS connections alive between requests
+    instead of handshaking on every call. A session belongs to the event
+    loop it was created on, so a new one is made if the loop changed
+    (scripts and tests that call asyncio.run more than once).
+    """
+    global _session, _session_loop
+    loop = asyncio.get_running_loop()
+    if _session is None or _session.closed or _session_loop is not loop:
+        _session = _new_session()
+        _session_loop = loop
+    return _session
+
+
+async def close_http_session() -> None:
+    global _session, _session_loop
+    session, _session, _session_loop = _session, None, None
+    if session is not None and not session.closed:
+        await session.close()
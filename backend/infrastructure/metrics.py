@@ -0,0 +1,107 @@
+import bisect
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+
+# Upper bounds of histogram buckets for durations in milliseconds
+DEFAULT_LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles resolve to a bucket's upper bound."""
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS_MS):
+        self.buckets = tuple(sorted(buckets))
+        # One extra slot for observations above the last bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else self.max
+        return self.max
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+
+def _label_key(labels: Dict[str, str]) -> str:
+    return ",".join(f"{key}={labels[key]}" for key in sorted(labels))
+
+
+class MetricsRegistry:
+    """
+    Process-local counters and histograms, keyed by name and labels.
+
+    Components that already keep their own numbers (caches, breakers)
+    register a collector callable instead; it is called on every snapshot.
+    """
+
+    def __init__(self):
+        self._counters: Dict[Tuple[str, str], Counter] = {}
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._collectors: Dict[str, Callable[[], Dict]] = {}
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        key = (name, _label_key(labels))
+        if key not in self._counters:
+            self._counters[key] = Counter()
+        return self._counters[key]
+
+    def histogram(self, name: str, buckets: Optional[Iterable[float]] = None, **labels: str) -> Histogram:
+        key = (name, _label_key(labels))
+        if key not in self._histograms:
+            self._histograms[key] = Histogram(buckets or DEFAULT_LATENCY_BUCKETS_MS)
+        return self._histograms[key]
+
+    def register_collector(self, name: str, collect: Callable[[], Dict]) -> None:
+        self._collectors[name] = collect
+
+    def snapshot(self) -> Dict:
+        counters: Dict[str, Dict[str, float]] = {}
+        for (name, labels), counter in self._counters.items():
+            counters.setdefault(name, {})[labels] = counter.value
+        histograms: Dict[str, Dict[str, Dict]] = {}
+        for (name, labels), histogram in self._histograms.items():
+            histograms.setdefault(name, {})[labels] = histogram.snapshot()
+        return {
+            "counters": counters,
+            "histograms": histograms,
+            **{name: collect() for name, collect in self._collectors.items()},
+        }
+
+    def reset(self) -> None:
+        self._counters.clear()
+        self._histograms.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,25 @@
+import uuid
+from typing import Optional
+
+
+# New review ids embed the review's partition key (its store_id) so a
+# review can be read with a single point read: "<store_id>_<uuid4>".
+# Reviews created before this scheme have a bare uuid4 id and are resolved
+# by the engine's legacy lookup instead.
+SEPARATOR = "_"
+_SUFFIX_LENGTH = len(SEPARATOR) + 36
+
+
+def new_review_id(store_id: str) -> str:
+    return f"{store_id}{SEPARATOR}{uuid.uuid4()}"
+
+
+def store_id_from_review_id(review_id: str) -> Optional[str]:
+    """Return the store_id encoded in a review id, or None for legacy ids."""
+    if len(review_id) <= _SUFFIX_LENGTH or review_id[-_SUFFIX_LENGTH] != SEPARATOR:
+        return None
+    try:
+        uuid.UUID(review_id[-_SUFFIX_LENGTH + 1:])
+    except ValueError:
+        return None
+    return review_id[:-_SUFFIX_LENGTH]
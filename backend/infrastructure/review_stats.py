@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, Optional
+
+
+# Running review aggregates are stored on each store document under this key
+REVIEW_STATS_FIELD = "review_stats"
+
+
+def empty_review_stats() -> Dict:
+    return {
+        "count": 0,
+        "rating_sum": 0,
+        "rating_histogram": {str(rating): 0 for rating in range(1, 6)},
+        "verified_count": 0,
+    }
+
+
+def _contribution(review: Dict, sign: int) -> Dict:
+    delta = {"count": sign, "rating_sum": 0, "rating_histogram": {}, "verified_count": 0}
+    rating = review.get("rating")
+    if rating is not None:
+        delta["rating_sum"] = sign * rating
+        delta["rating_histogram"][str(rating)] = sign
+    if review.get("verified"):
+        delta["verified_count"] = sign
+    return delta
+
+
+def _merge(target: Dict, delta: Dict) -> Dict:
+    target["count"] += delta["count"]
+    target["rating_sum"] += delta["rating_sum"]
+    target["verified_count"] += delta["verified_count"]
+    histogram = target["rating_histogram"]
+    for bucket, value in delta["rating_histogram"].items():
+        histogram[bucket] = histogram.get(bucket, 0) + value
+    return target
+
+
+def _is_zero(delta: Dict) -> bool:
+    return (
+        delta["count"] == 0
+        and delta["rating_sum"] == 0
+        and delta["verified_count"] == 0
+        and not any(delta["rating_histogram"].values())
+    )
+
+
+def review_stats_changes(before: Optional[Dict], after: Optional[Dict]) -> Dict[str, Dict]:
+    """
+    Return the aggregate deltas caused by a review write, keyed by store_id.
+
+    `before` is the stored review (None on create) and `after` the review as
+    written. Stores whose aggregates do not change are left out.
+    """
+    changes: Dict[str, Dict] = {}
+    for review, sign in ((before, -1), (after, 1)):
+        if review and review.get("store_id"):
+            store_id = review["store_id"]
+            delta = changes.setdefault(
+                store_id, {"count": 0, "rating_sum": 0, "rating_histogram": {}, "verified_count": 0}
+            )
+            _merge(delta, _contribution(review, sign))
+
+    for delta in changes.values():
+        delta["rating_histogram"] = {k: v for k, v in delta["rating_histogram"].items() if v}
+    return {store_id: delta for store_id, delta in changes.items() if not _is_zero(delta)}
+
+
+def apply_review_stats_delta(stats: Optional[Dict], delta: Dict) -> Dict:
+    merged = empty_review_stats()
+    if stats:
+        _merge(merged, {**stats, "rating_histogram": dict(stats.get("rating_histogram", {}))})
+    return _merge(merged, delta)
+
+
+def compute_review_stats(reviews: Iterable[Dict]) -> Dict:
+    stats = empty_review_stats()
+    for review in reviews:
+        _merge(stats, _contribution(review, 1))
+    return stats
+
+
+def review_stats_summary(stats: Dict) -> Dict:
+    """Shape stored aggregates for GET /api/stores/{store_id}/stats."""
+    count = stats.get("count", 0)
+    return {
+        "total_reviews": count,
+        "average_rating": stats.get("rating_sum", 0) / count if count else 0,
+        "verified_reviews": stats.get("verified_count", 0),
+        "rating_histogram": stats.get("rating_histogram", {}),
+    }
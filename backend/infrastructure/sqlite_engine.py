@@ -0,0 +1,342 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+from infrastructure.storage_engine import StorageEngine, STORE_SEARCH_FIELDS, InvalidContinuationToken
+from infrastructure.review_stats import (
+    REVIEW_STATS_FIELD,
+    apply_review_stats_delta,
+    compute_review_stats,
+    review_stats_changes,
+)
+from infrastructure.storage_metrics import record_query
+
+
+# Documents are kept whole in the `doc` column so stores and reviews stay as
+# schemaless as they are in Cosmos; the other columns are copies of the
+# fields we filter on, indexed the same way as schema.sql.
+SCHEMA = """
+create table if not exists stores (
+    id text primary key,
+    name text,
+    category text,
+    btc_address text,
+    verified integer not null default 0,
+    created_at text,
+    updated_at text,
+    doc text not null
+);
+
+create table if not exists reviews (
+    id text primary key,
+    store_id text,
+    rating integer,
+    txid text,
+    verified integer not null default 0,
+    user_pubkey text,
+    created_at text,
+    doc text not null
+);
+
+create index if not exists stores_btc_address_idx on stores(btc_address);
+create index if not exists stores_category_verified_idx on stores(category, verified);
+create index if not exists stores_verified_idx on stores(verified);
+create index if not exists reviews_store_id_idx on reviews(store_id);
+create index if not exists reviews_txid_idx on reviews(txid);
+create index if not exists reviews_user_pubkey_idx on reviews(user_pubkey);
+"""
+
+
+def _store_row(doc: Dict) -> tuple:
+    return (
+        doc["id"],
+        doc.get("name"),
+        doc.get("category"),
+        doc.get("btc_address"),
+        1 if doc.get("verified") else 0,
+        doc.get("created_at"),
+        doc.get("updated_at"),
+        json.dumps(doc),
+    )
+
+
+def _review_row(doc: Dict) -> tuple:
+    return (
+        doc["id"],
+        doc.get("store_id"),
+        doc.get("rating"),
+        doc.get("txid"),
+        1 if doc.get("verified") else 0,
+        doc.get("user_pubkey"),
+        doc.get("created_at"),
+        json.dumps(doc),
+    )
+
+
+class SqliteStorageEngine(StorageEngine):
+    """
+    Single-file SQLite engine running in WAL mode.
+
+    sqlite3 is blocking, so each operation runs on the default executor
+    behind one shared connection guarded by a lock.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        # Statements are attributed to the repository call that issued them
+        record_query(sql)
+        return self._conn.execute(sql, params)
+
+    def _query(self, sql: str, params: tuple = ()) -> List[Dict]:
+        with self._lock:
+            rows = self._execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _write_store_doc(self, doc: Dict) -> None:
+        self._execute(
+            "UPDATE stores SET name = ?, category = ?, btc_address = ?, verified = ?, "
+            "created_at = ?, updated_at = ?, doc = ? WHERE id = ?",
+            _store_row(doc)[1:] + (doc["id"],),
+        )
+
+    def _get_stores(self) -> List[Dict]:
+        return self._query("SELECT doc FROM stores ORDER BY rowid")
+
+    def _get_store(self, store_id: str) -> Optional[Dict]:
+        rows = self._query("SELECT doc FROM stores WHERE id = ?", (store_id,))
+        return rows[0] if rows else None
+
+    def _query_stores(
+        self,
+        category: Optional[str],
+        verified: Optional[bool],
+        limit: int,
+        offset: int,
+        continuation_token: Optional[str],
+    ) -> Tuple[List[Dict], Optional[str]]:
+        # Keyset pagination on rowid: the token is the last rowid returned
+        conditions = []
+        params: list = []
+        if category:
+            conditions.append("category = ?")
+            params.append(category)
+        if verified is not None:
+            conditions.append("verified = ?")
+            params.append(1 if verified else 0)
+        if continuation_token:
+            try:
+                after = int(continuation_token)
+            except ValueError:
+                raise InvalidContinuationToken("Invalid continuation token")
+            conditions.append("rowid > ?")
+            params.append(after)
+            offset = 0
+
+        sql = "SELECT rowid, doc FROM stores"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY rowid LIMIT ? OFFSET ?"
+        # Fetch one extra row to know whether another page exists
+        params += [limit + 1, offset]
+
+        with self._lock:
+            rows = self._execute(sql, params).fetchall()
+
+        next_token = str(rows[limit - 1][0]) if len(rows) > limit else None
+        stores = []
+        for _, doc in rows[:limit]:
+            data = json.loads(doc)
+            stores.append({field: data[field] for field in STORE_SEARCH_FIELDS if field in data})
+        return stores, next_token
+
+    def _create_store(self, store_data: Dict) -> Dict:
+        with self._lock:
+            self._execute("INSERT INTO stores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _store_row(store_data))
+        return dict(store_data)
+
+    def _update_store(self, store_id: str, update_data: Dict) -> Optional[Dict]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._execute("SELECT doc FROM stores WHERE id = ?", (store_id,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                updated = {**json.loads(row[0]), **update_data}
+                self._write_store_doc(updated)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return updated
+
+    def _get_reviews(self, store_id: Optional[str] = None) -> List[Dict]:
+        if store_id:
+            return self._query("SELECT doc FROM reviews WHERE store_id = ? ORDER BY rowid", (store_id,))
+        return self._query("SELECT doc FROM reviews ORDER BY rowid")
+
+    def _apply_review_stats(self, before: Optional[Dict], after: Optional[Dict]) -> None:
+        # Runs inside the caller's transaction so aggregates and the review
+        # commit together
+        for store_id, delta in review_stats_changes(before, after).items():
+            row = self._execute("SELECT doc FROM stores WHERE id = ?", (store_id,)).fetchone()
+            if row is None:
+                continue
+            store = json.loads(row[0])
+            store[REVIEW_STATS_FIELD] = apply_review_stats_delta(store.get(REVIEW_STATS_FIELD), delta)
+            self._write_store_doc(store)
+
+    def _get_review(self, review_id: str) -> Optional[Dict]:
+        rows = self._query("SELECT doc FROM reviews WHERE id = ?", (review_id,))
+        return rows[0] if rows else None
+
+    def _create_review(self, review_data: Dict) -> Dict:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._execute("INSERT INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _review_row(review_data))
+                self._apply_review_stats(None, review_data)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return dict(review_data)
+
+    def _update_review(self, review_id: str, update_data: Dict) -> Optional[Dict]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._execute("SELECT doc FROM reviews WHERE id = ?", (review_id,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                updated = {**json.loads(row[0]), **update_data}
+                self._execute(
+                    "UPDATE reviews SET store_id = ?, rating = ?, txid = ?, verified = ?, "
+                    "user_pubkey = ?, created_at = ?, doc = ? WHERE id = ?",
+                    _review_row(updated)[1:] + (review_id,),
+                )
+                self._apply_review_stats(json.loads(row[0]), updated)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return updated
+
+    def _rebuild_review_stats(self, store_id: str) -> Optional[Dict]:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._execute("SELECT doc FROM stores WHERE id = ?", (store_id,)).fetchone()
+                if row is None:
+                    self._conn.execute("ROLLBACK")
+                    return None
+                reviews = self._execute("SELECT doc FROM reviews WHERE store_id = ?", (store_id,)).fetchall()
+                stats = compute_review_stats(json.loads(review[0]) for review in reviews)
+                store = json.loads(row[0])
+                store[REVIEW_STATS_FIELD] = stats
+                self._write_store_doc(store)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return stats
+
+    def _read_page(self, table: str, page_size: int, continuation_token: Optional[str]) -> Tuple[List[Dict], Optional[str]]:
+        try:
+            after = int(continuation_token) if continuation_token else 0
+        except ValueError:
+            raise InvalidContinuationToken("Invalid continuation token")
+        with self._lock:
+            rows = self._execute(
+                f"SELECT rowid, doc FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?", (after, page_size)
+            ).fetchall()
+        next_token = str(rows[-1][0]) if len(rows) == page_size else None
+        return [json.loads(doc) for _, doc in rows], next_token
+
+    def _upsert(self, sql: str, rows: List[tuple]) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                record_query(sql)
+                self._conn.executemany(sql, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    async def get_stores(self) -> List[Dict]:
+        return await asyncio.to_thread(self._get_stores)
+
+    async def get_store(self, store_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._get_store, store_id)
+
+    async def query_stores(
+        self,
+        category: Optional[str] = None,
+        verified: Optional[bool] = None,
+        limit: int = 10,
+        offset: int = 0,
+        continuation_token: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        return await asyncio.to_thread(
+            self._query_stores, category, verified, limit, offset, continuation_token
+        )
+
+    async def create_store(self, store_data: Dict) -> Dict:
+        return await asyncio.to_thread(self._create_store, store_data)
+
+    async def update_store(self, store_id: str, update_data: Dict) -> Optional[Dict]:
+        return await asyncio.to_thread(self._update_store, store_id, update_data)
+
+    async def get_reviews(self, store_id: Optional[str] = None) -> List[Dict]:
+        return await asyncio.to_thread(self._get_reviews, store_id)
+
+    async def get_review(self, review_id: str, store_id: Optional[str] = None) -> Optional[Dict]:
+        # Review ids are the primary key here, so the partition hint is unused
+        return await asyncio.to_thread(self._get_review, review_id)
+
+    async def create_review(self, review_data: Dict) -> Dict:
+        return await asyncio.to_thread(self._create_review, review_data)
+
+    async def update_review(self, review_id: str, update_data: Dict, store_id: Optional[str] = None) -> Optional[Dict]:
+        return await asyncio.to_thread(self._update_review, review_id, update_data)
+
+    async def read_stores_page(
+        self, page_size: int, continuation_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        return await asyncio.to_thread(self._read_page, "stores", page_size, continuation_token)
+
+    async def read_reviews_page(
+        self, page_size: int, continuation_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        return await asyncio.to_thread(self._read_page, "reviews", page_size, continuation_token)
+
+    async def upsert_stores(self, stores: List[Dict], concurrency: int = 16) -> None:
+        # One transaction per batch; concurrency does not apply to a single file
+        await asyncio.to_thread(
+            self._upsert, "INSERT OR REPLACE INTO stores VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [_store_row(s) for s in stores]
+        )
+
+    async def upsert_reviews(self, reviews: List[Dict], concurrency: int = 16) -> None:
+        await asyncio.to_thread(
+            self._upsert, "INSERT OR REPLACE INTO reviews VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [_review_row(r) for r in reviews]
+        )
+
+    async def rebuild_review_stats(self, store_id: str) -> Optional[Dict]:
+        return await asyncio.to_thread(self._rebuild_review_stats, store_id)
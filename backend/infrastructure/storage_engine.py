@@ -0,0 +1,157 @@
+from typing import Dict, List, Optional, Tuple
+from cosmos_config import get_storage_config
+
+
+# Fields returned by store searches; matches the Store response model
+STORE_SEARCH_FIELDS = (
+    "id", "name", "description", "category", "website", "btc_address",
+    "banner_image_url", "profile_image_url", "verified", "verification_txid",
+    "verification_amount", "created_at", "updated_at",
+)
+
+
+class InvalidContinuationToken(ValueError):
+    """Raised when a search continuation token cannot be resumed."""
+
+
+class ConcurrentUpdateError(RuntimeError):
+    """Raised when an optimistic update keeps losing to concurrent writers."""
+
+
+class StorageEngine:
+    """
+    Persistence backend used by cosmos_repository.
+
+    Engines store and return plain dicts. They raise on backend errors and
+    return None when the requested document does not exist; wrapping results
+    for the routers stays in cosmos_repository. Every operation is a
+    coroutine so handlers never block the event loop on I/O.
+
+    create_review and update_review also keep the store's running review
+    aggregates (see infrastructure.review_stats) in step with the write.
+    """
+
+    # Request units consumed so far; only engines that bill by RU count them
+    request_charge: float = 0.0
+
+    async def open(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def get_stores(self) -> List[Dict]:
+        raise NotImplementedError
+
+    async def get_store(self, store_id: str) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def query_stores(
+        self,
+        category: Optional[str] = None,
+        verified: Optional[bool] = None,
+        limit: int = 10,
+        offset: int = 0,
+        continuation_token: Optional[str] = None,
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """
+        Return one page of stores matching the filters, projected to
+        STORE_SEARCH_FIELDS, plus the token for the next page (None on the
+        last page). Filters are evaluated by the backend, not in Python.
+        """
+        raise NotImplementedError
+
+    async def create_store(self, store_data: Dict) -> Dict:
+        raise NotImplementedError
+
+    async def update_store(self, store_id: str, update_data: Dict) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def get_reviews(self, store_id: Optional[str] = None) -> List[Dict]:
+        raise NotImplementedError
+
+    async def get_review(self, review_id: str, store_id: Optional[str] = None) -> Optional[Dict]:
+        """
+        Read one review. `store_id` is the partition hint decoded from the
+        review id; it is None for legacy ids, which the engine must resolve.
+        """
+        raise NotImplementedError
+
+    async def create_review(self, review_data: Dict) -> Dict:
+        raise NotImplementedError
+
+    async def update_review(self, review_id: str, update_data: Dict, store_id: Optional[str] = None) -> Optional[Dict]:
+        raise NotImplementedError
+
+    async def read_stores_page(
+        self, page_size: int, continuation_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Return raw store documents in a stable order, one page at a time."""
+        raise NotImplementedError
+
+    async def read_reviews_page(
+        self, page_size: int, continuation_token: Optional[str] = None
+    ) -> Tuple[List[Dict], Optional[str]]:
+        """Return raw review documents in a stable order, one page at a time."""
+        raise NotImplementedError
+
+    async def upsert_stores(self, stores: List[Dict], concurrency: int = 16) -> None:
+        """
+        Write store documents as-is, replacing any with the same id. Used by
+        bulk tooling: no timestamps are touched and no aggregates updated.
+        """
+        raise NotImplementedError
+
+    async def upsert_reviews(self, reviews: List[Dict], concurrency: int = 16) -> None:
+        """Write review documents as-is, replacing any with the same id."""
+        raise NotImplementedError
+
+    async def rebuild_review_stats(self, store_id: str) -> Optional[Dict]:
+        """
+        Recompute a store's review aggregates from its reviews and save them.
+        Returns the new aggregates, or None if the store does not exist.
+        """
+        raise NotImplementedError
+
+
+_engine: Optional[StorageEngine] = None
+
+
+def get_storage_engine() -> StorageEngine:
+    """Return the process-wide storage engine selected by STORAGE_ENGINE."""
+    global _engine
+
+    if _engine is not None:
+        return _engine
+
+    cfg = get_storage_config()
+    if cfg.engine == "sqlite":
+        from infrastructure.sqlite_engine import SqliteStorageEngine
+        _engine = SqliteStorageEngine(cfg.sqlite_path)
+    else:
+        from infrastructure.cosmos_engine import CosmosStorageEngine
+        _engine = CosmosStorageEngine()
+
+    return _engine
+
+
+def set_storage_engine(engine: Optional[StorageEngine]) -> None:
+    """Replace the process-wide engine (used by tests and tooling)."""
+    global _engine
+    _engine = engine
+
+
+async def open_storage_engine() -> StorageEngine:
+    """Create and connect the engine; called from the app lifespan."""
+    engine = get_storage_engine()
+    await engine.open()
+    return engine
+
+
+async def close_storage_engine() -> None:
+    """Release the engine's connections; called from the app lifespan."""
+    global _engine
+
+    if _engine is not None:
+        await _engine.close()
+    _engine = None
@@ -0,0 +1,104 @@
+import functools
+import logging
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+from infrastructure.metrics import metrics
+
+logger = logging.getLogger("storage.slow")
+
+# Repository calls slower than this are logged and kept in slow_queries
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "500"))
+slow_queries: Deque[Dict] = deque(maxlen=int(os.getenv("SLOW_QUERY_LOG_SIZE", "100")))
+
+REQUEST_CHARGE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+ITEM_COUNT_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+
+@dataclass
+class CallStats:
+    request_charge: float = 0.0
+    queries: List[str] = field(default_factory=list)
+
+
+_current_call: ContextVar[Optional[CallStats]] = ContextVar("storage_call", default=None)
+
+
+def record_request_charge(charge: float) -> None:
+    """Attribute request units to the repository call in progress, if any."""
+    stats = _current_call.get()
+    if stats is not None:
+        stats.request_charge += charge
+
+
+def record_query(text: str) -> None:
+    """Attribute a query (or a description of a point operation) to the call in progress."""
+    stats = _current_call.get()
+    if stats is not None:
+        stats.queries.append(text)
+
+
+def _item_count(result: Any) -> int:
+    # Repository results are dicts, lists, (items, token) pages or
+    # SupabaseResponse-style objects with a `data` attribute
+    if hasattr(result, "data") and hasattr(result, "error"):
+        result = result.data
+    if isinstance(result, tuple):
+        result = result[0]
+    if result is None:
+        return 0
+    if isinstance(result, list):
+        return len(result)
+    return 1
+
+
+def instrumented(operation: str) -> Callable:
+    """
+    Record duration, request charge, item count and query text for an async
+    repository function under `operation`, and log it if it is slow.
+    """
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            stats = CallStats()
+            token = _current_call.set(stats)
+            started = time.perf_counter()
+            failed = False
+            result = None
+            try:
+                result = await fn(*args, **kwargs)
+                failed = bool(getattr(result, "error", None))
+                return result
+            except Exception:
+                failed = True
+                raise
+            finally:
+                _current_call.reset(token)
+                duration_ms = (time.perf_counter() - started) * 1000
+                items = _item_count(result)
+                metrics.counter("storage_calls_total", operation=operation).inc()
+                if failed:
+                    metrics.counter("storage_errors_total", operation=operation).inc()
+                metrics.counter("storage_request_units_total", operation=operation).inc(stats.request_charge)
+                metrics.histogram("storage_latency_ms", operation=operation).observe(duration_ms)
+                metrics.histogram(
+                    "storage_request_charge", REQUEST_CHARGE_BUCKETS, operation=operation
+                ).observe(stats.request_charge)
+                metrics.histogram("storage_items", ITEM_COUNT_BUCKETS, operation=operation).observe(items)
+                if duration_ms >= SLOW_QUERY_THRESHOLD_MS:
+                    entry = {
+                        "operation": operation,
+                        "duration_ms": round(duration_ms, 2),
+                        "request_charge": stats.request_charge,
+                        "items": items,
+                        "queries": stats.queries,
+                        "at": datetime.now(timezone.utc).isoformat(),
+                    }
+                    slow_queries.append(entry)
+                    logger.warning(f"Slow storage call: {entry}")
+        return wrapper
+    return decorator
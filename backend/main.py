@@ -1,16 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 import os
-from routers import stores, reviews, auth
+from routers import stores, reviews, auth, metrics, verification
+from infrastructure.storage_engine import open_storage_engine, close_storage_engine
+from infrastructure.http_client import close_http_session
+from services.transaction_monitor import close_transaction_monitor
+from services.verification_jobs import get_verification_queue
 
 # Load environment variables
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Open shared clients once per process and release them on shutdown
+    await open_storage_engine()
+    await get_verification_queue().start()
+    try:
+        yield
+    finally:
+        await get_verification_queue().stop()
+        await close_transaction_monitor()
+        await close_http_session()
+        await close_storage_engine()
+
+
 app = FastAPI(
     title="We Accept Bitcoin API",
     description="API for Bitcoin-accepting store directory with verified reviews",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -35,6 +56,8 @@ async def root():
 app.include_router(stores.router, prefix="/api/stores", tags=["stores"])
 app.include_router(reviews.router, prefix="/api/reviews", tags=["reviews"])
 app.include_router(auth.router, prefix="", tags=["auth"])
+app.include_router(verification.router, prefix="/api/verifications", tags=["verifications"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 if __name__ == "__main__":
     import uvicorn
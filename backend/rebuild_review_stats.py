@@ -0,0 +1,40 @@
+import argparse
+import asyncio
+from dotenv import load_dotenv
+from cosmos_repository import query_stores, rebuild_review_stats
+from infrastructure.storage_engine import close_storage_engine
+
+# Load environment variables
+load_dotenv()
+
+
+async def rebuild(store_id=None):
+    """Recompute review aggregates for one store, or every store page by page."""
+    try:
+        if store_id:
+            stats = await rebuild_review_stats(store_id)
+            if stats is None:
+                print(f"Store not found: {store_id}")
+            else:
+                print(f"Rebuilt review stats for {store_id}: {stats}")
+            return
+
+        rebuilt = 0
+        token = None
+        while True:
+            stores, token = await query_stores(limit=100, continuation_token=token)
+            for store in stores:
+                await rebuild_review_stats(store["id"])
+                rebuilt += 1
+            print(f"Rebuilt review stats for {rebuilt} stores")
+            if not token:
+                break
+    finally:
+        await close_storage_engine()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute per-store review aggregates from the reviews")
+    parser.add_argument("--store-id", help="Only rebuild this store")
+    args = parser.parse_args()
+    asyncio.run(rebuild(args.store_id))
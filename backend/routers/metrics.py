@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from infrastructure.metrics import metrics
+from infrastructure.storage_metrics import slow_queries, SLOW_QUERY_THRESHOLD_MS
+
+router = APIRouter()
+
+
+@router.get("")
+async def get_metrics():
+    """Process-local counters, latency/RU histograms and the recent slow storage calls."""
+    return {
+        **metrics.snapshot(),
+        "slow_queries": {
+            "threshold_ms": SLOW_QUERY_THRESHOLD_MS,
+            "recent": list(slow_queries),
+        },
+    }
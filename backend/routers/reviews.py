@@ -1,13 +1,13 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from typing import List, Optional
 from pydantic import BaseModel, constr, validator
-from services.transaction_monitor import TransactionMonitor
+from services.transaction_monitor import get_transaction_monitor
 from services.lnurl_auth import LnurlAuthService
-from cosmos_repository import get_reviews, create_review, get_store, update_review
+from cosmos_repository import get_reviews, get_review as read_review, create_review, get_store, update_review
 import os
 
 router = APIRouter()
-transaction_monitor = TransactionMonitor()
+transaction_monitor = get_transaction_monitor()
 # Use the singleton instance
 lnurl_auth_service = LnurlAuthService(domain=os.getenv("DOMAIN", "localhost"))
 
@@ -52,7 +52,7 @@ async def create_new_review(review: ReviewCreate):
     """Create a new review."""
     try:
         # Check if store exists
-        store = get_store(review.store_id)
+        store = await get_store(review.store_id)
         if not store:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -68,7 +68,7 @@ async def create_new_review(review: ReviewCreate):
 
         # Create review with all fields including verified
         review_data = review.dict()
-        response = create_review(review_data)
+        response = await create_review(review_data)
         if response.error:
             raise HTTPException(status_code=500, detail=response.error)
             
@@ -92,7 +92,7 @@ async def create_new_review(review: ReviewCreate):
 async def list_store_reviews(store_id: str):
     try:
         print(f"Fetching reviews for store ID: {store_id}")
-        response = get_reviews(store_id)
+        response = await get_reviews(store_id)
         print(f"Response from get_reviews: {response}")
         
         if response.error:
@@ -118,12 +118,11 @@ async def list_store_reviews(store_id: str):
 async def get_review(review_id: str):
     """Get a specific review by ID."""
     try:
-        response = get_reviews(None)  # Get all reviews
+        response = await read_review(review_id)
         if response.error:
             raise HTTPException(status_code=500, detail=response.error)
-            
-        reviews = response.data if isinstance(response.data, list) else []
-        review = next((r for r in reviews if r["id"] == review_id), None)
+
+        review = response.data
         
         if not review:
             raise HTTPException(
@@ -131,6 +130,8 @@ async def get_review(review_id: str):
                 detail="Review not found"
             )
         return review
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -142,7 +143,7 @@ async def verify_review_transaction(store_id: str, verification: VerificationReq
         print(f"Verification request data: {verification}")
         
         # Check if store exists
-        store = get_store(store_id)
+        store = await get_store(store_id)
         if not store:
             print(f"Store not found with ID: {store_id}")
             raise HTTPException(
@@ -165,7 +166,7 @@ async def verify_review_transaction(store_id: str, verification: VerificationReq
             error_msg = verification_result.get('error', 'Invalid review transaction')
             print(f"Verification failed: {error_msg}")
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE if verification_result.get('retryable') else status.HTTP_400_BAD_REQUEST,
                 detail=error_msg
             )
             
@@ -187,12 +188,11 @@ async def verify_review_transaction(store_id: str, verification: VerificationReq
 async def verify_review(review_id: str):
     """Verify a review using its associated Bitcoin transaction."""
     try:
-        response = get_reviews(None)  # Get all reviews
+        response = await read_review(review_id)
         if response.error:
             raise HTTPException(status_code=500, detail=response.error)
-            
-        reviews = response.data if isinstance(response.data, list) else []
-        review = next((r for r in reviews if r["id"] == review_id), None)
+
+        review = response.data
         
         if not review:
             raise HTTPException(
@@ -207,7 +207,7 @@ async def verify_review(review_id: str):
             )
 
         # Get the store's Bitcoin address
-        store = get_store(review["store_id"])
+        store = await get_store(review["store_id"])
         if not store:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -215,19 +215,21 @@ async def verify_review(review_id: str):
             )
 
         # Verify the transaction
-        is_valid = await transaction_monitor.verify_review_transaction(review["txid"], store["btc_address"])
-        if not is_valid:
+        verification_result = await transaction_monitor.verify_review_transaction(review["txid"], store["btc_address"])
+        if not verification_result.get('verified', False):
             raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid review transaction"
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE if verification_result.get('retryable') else status.HTTP_400_BAD_REQUEST,
+                detail=verification_result.get('error', "Invalid review transaction")
             )
 
         # Update review verification status
-        update_response = update_review(review_id, {"verified": True})
+        update_response = await update_review(review_id, {"verified": True})
         if update_response.error:
             raise HTTPException(status_code=500, detail=update_response.error)
             
         return {"status": "success", "message": "Review verified successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
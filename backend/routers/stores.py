@@ -1,13 +1,15 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Response
 from pydantic import BaseModel, constr, UUID4
 from typing import Optional, List
-from cosmos_repository import get_store, get_stores, create_store, update_store, get_reviews
+from cosmos_repository import get_store, get_stores, query_stores, create_store, update_store, rebuild_review_stats
+from infrastructure.storage_engine import InvalidContinuationToken
+from infrastructure.review_stats import REVIEW_STATS_FIELD, review_stats_summary
 from services.bitcoin import verify_transaction
-from services.transaction_monitor import TransactionMonitor
+from services.transaction_monitor import get_transaction_monitor
 from services.image_upload import upload_image, delete_image
 
 router = APIRouter()
-transaction_monitor = TransactionMonitor()
+transaction_monitor = get_transaction_monitor()
 
 class StoreBase(BaseModel):
     name: str
@@ -37,7 +39,7 @@ class VerificationRequest(BaseModel):
 @router.get("", response_model=List[Store])
 async def list_stores():
     try:
-        stores = get_stores()
+        stores = await get_stores()
         if not stores:
             return []
         return stores
@@ -46,25 +48,33 @@ async def list_stores():
 
 @router.get("/search", response_model=List[Store])
 async def search_stores(
+    response: Response,
     category: Optional[str] = None,
     verified: Optional[bool] = None,
-    limit: int = 10,
-    offset: int = 0
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    continuation_token: Optional[str] = None
 ):
-    """Search stores with filters"""
+    """
+    Search stores with filters.
+
+    Filters run in the database. When more results exist, the token for the
+    next page is returned in the X-Continuation-Token header; pass it back as
+    `continuation_token` instead of paging with `offset`.
+    """
     try:
-        stores = get_stores()
-        if not stores:
-            return []
-        
-        # Apply filters
-        if category:
-            stores = [s for s in stores if s.get('category') == category]
-        if verified is not None:
-            stores = [s for s in stores if s.get('verified') == verified]
-            
-        # Apply pagination
-        return stores[offset:offset + limit]
+        stores, next_token = await query_stores(
+            category=category,
+            verified=verified,
+            limit=limit,
+            offset=offset,
+            continuation_token=continuation_token
+        )
+        if next_token:
+            response.headers["X-Continuation-Token"] = next_token
+        return stores
+    except InvalidContinuationToken as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -72,7 +82,7 @@ async def search_stores(
 async def get_categories():
     """Get all unique store categories"""
     try:
-        stores = get_stores()
+        stores = await get_stores()
         if not stores:
             return []
         categories = set(s.get('category') for s in stores if s.get('category'))
@@ -89,7 +99,7 @@ async def get_store_by_id(store_id: str):
         except ValueError:
             raise HTTPException(status_code=404, detail="Invalid store ID format")
             
-        store = get_store(store_id)
+        store = await get_store(store_id)
         if not store:
             raise HTTPException(status_code=404, detail="Store not found")
         return store
@@ -106,7 +116,7 @@ async def verify_store_transaction(verification: VerificationRequest):
             raise HTTPException(status_code=400, detail="Bitcoin address is required")
             
         # Verify the transaction
-        verification_result = verify_transaction(
+        verification_result = await verify_transaction(
             txid=verification.txid,
             expected_address=verification.btc_address,
             min_amount=verification.verification_amount or transaction_monitor.get_verification_amount()
@@ -114,7 +124,7 @@ async def verify_store_transaction(verification: VerificationRequest):
         
         if not verification_result['verified']:
             raise HTTPException(
-                status_code=400,
+                status_code=503 if verification_result.get('retryable') else 400,
                 detail=verification_result.get('error', 'Transaction verification failed')
             )
             
@@ -154,7 +164,7 @@ async def create_store_endpoint(
             "verification_amount": verification_amount
         }
         
-        store = create_store(store_data)
+        store = await create_store(store_data)
         if not store:
             raise HTTPException(status_code=400, detail="Failed to create store")
             
@@ -168,7 +178,7 @@ async def create_store_endpoint(
                 "banner"
             )
             if banner_url:
-                store = update_store(store["id"], {"banner_image_url": banner_url})
+                store = await update_store(store["id"], {"banner_image_url": banner_url})
                 
         if profile_image:
             profile_data = await profile_image.read()
@@ -179,7 +189,7 @@ async def create_store_endpoint(
                 "profile"
             )
             if profile_url:
-                store = update_store(store["id"], {"profile_image_url": profile_url})
+                store = await update_store(store["id"], {"profile_image_url": profile_url})
                 
         return store
         
@@ -196,12 +206,12 @@ async def create_store_endpoint(
 async def update_store_by_id(store_id: str, store: StoreBase):
     try:
         # First check if store exists
-        existing_store = get_store(store_id)
+        existing_store = await get_store(store_id)
         if not existing_store:
             raise HTTPException(status_code=404, detail="Store not found")
         
         update_data = store.model_dump(exclude_unset=True)
-        response = update_store(store_id, update_data)
+        response = await update_store(store_id, update_data)
         if not response:
             raise HTTPException(status_code=500, detail="Failed to update store")
         return response
@@ -212,7 +222,7 @@ async def update_store_by_id(store_id: str, store: StoreBase):
 async def verify_store(store_id: str, verification: VerificationRequest):
     """Verify a store using Bitcoin transaction"""
     try:
-        store = get_store(store_id)
+        store = await get_store(store_id)
         if not store:
             raise HTTPException(status_code=404, detail="Store not found")
             
@@ -223,7 +233,7 @@ async def verify_store(store_id: str, verification: VerificationRequest):
             raise HTTPException(status_code=400, detail="Store has no verification amount set")
             
         # Verify the transaction
-        verification_result = verify_transaction(
+        verification_result = await verify_transaction(
             txid=verification.txid,
             expected_address=store['btc_address'],
             min_amount=store['verification_amount']
@@ -231,7 +241,7 @@ async def verify_store(store_id: str, verification: VerificationRequest):
         
         if not verification_result['verified']:
             raise HTTPException(
-                status_code=400,
+                status_code=503 if verification_result.get('retryable') else 400,
                 detail=verification_result.get('error', 'Transaction verification failed')
             )
             
@@ -242,7 +252,7 @@ async def verify_store(store_id: str, verification: VerificationRequest):
             "verification_amount": verification_result.get('amount'),
         }
         
-        response = update_store(store_id, update_data)
+        response = await update_store(store_id, update_data)
         if not response:
             raise HTTPException(status_code=500, detail="Failed to verify store")
         return response
@@ -253,22 +263,21 @@ async def verify_store(store_id: str, verification: VerificationRequest):
 
 @router.get("/{store_id}/stats")
 async def get_store_stats(store_id: str):
-    """Get store statistics"""
+    """Get store statistics from the store's running review aggregates"""
     try:
-        store = get_store(store_id)
+        store = await get_store(store_id)
         if not store:
             raise HTTPException(status_code=404, detail="Store not found")
-            
-        reviews = get_reviews(store_id)
-        if not reviews:
-            reviews = []
-        
-        stats = {
-            "total_reviews": len(reviews),
-            "average_rating": sum(r.get('rating', 0) for r in reviews) / len(reviews) if reviews else 0,
-            "verified_reviews": len([r for r in reviews if r.get('verified', False)])
-        }
-        
-        return stats
+
+        stats = store.get(REVIEW_STATS_FIELD)
+        if stats is None:
+            # Store predates aggregates; build them once and keep them
+            stats = await rebuild_review_stats(store_id)
+            if stats is None:
+                raise HTTPException(status_code=404, detail="Store not found")
+
+        return review_stats_summary(stats)
+    except HTTPException as e:
+        raise e
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
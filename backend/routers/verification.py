@@ -0,0 +1,129 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, conint, conlist, constr, root_validator
+from typing import AsyncIterator, Dict, List, Literal, Optional
+from cosmos_repository import get_store, get_review
+from services.transaction_monitor import get_transaction_monitor
+from services.verification_jobs import get_verification_queue
+import asyncio
+import json
+import os
+
+router = APIRouter()
+transaction_monitor = get_transaction_monitor()
+
+# Upper bounds for one batch request
+BATCH_VERIFY_MAX_ITEMS = int(os.getenv("BATCH_VERIFY_MAX_ITEMS", "500"))
+BATCH_VERIFY_MAX_CONCURRENCY = int(os.getenv("BATCH_VERIFY_MAX_CONCURRENCY", "16"))
+
+class BatchVerificationItem(BaseModel):
+    txid: constr(min_length=64, max_length=64)
+    address: constr(min_length=26, max_length=100)
+    amount: Optional[int] = None
+    # "review": payment to the store address; "store": payment from it
+    kind: Literal["review", "store"] = "review"
+
+    @root_validator(skip_on_failure=True)
+    def store_needs_amount(cls, values):
+        if values.get("kind") == "store" and values.get("amount") is None:
+            raise ValueError("amount is required for store verification")
+        return values
+
+class BatchVerificationRequest(BaseModel):
+    items: conlist(BatchVerificationItem, min_items=1, max_items=BATCH_VERIFY_MAX_ITEMS)
+    concurrency: conint(ge=1, le=BATCH_VERIFY_MAX_CONCURRENCY) = 8
+
+class VerificationJobRequest(BaseModel):
+    kind: Literal["review", "store"]
+    # Store id or review id
+    target_id: str
+    # Defaults to the review's own txid for review jobs
+    txid: Optional[constr(min_length=64, max_length=64)] = None
+    # Defaults to the store's verification_amount for store jobs
+    verification_amount: Optional[int] = None
+
+async def _verify_item(item: BatchVerificationItem) -> Dict:
+    try:
+        if item.kind == "store":
+            return await transaction_monitor.verify_store_transaction(item.txid, item.address, item.amount)
+        return await transaction_monitor.verify_review_transaction(item.txid, item.address, item.amount)
+    except Exception as e:
+        return {"verified": False, "error": str(e)}
+
+async def _stream_results(items: List[BatchVerificationItem], concurrency: int) -> AsyncIterator[bytes]:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, item: BatchVerificationItem) -> Dict:
+        async with semaphore:
+            result = await _verify_item(item)
+        return {"index": index, "txid": item.txid, "kind": item.kind, **result}
+
+    tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield (json.dumps(await next_done) + "\n").encode()
+    finally:
+        # The client went away: stop fetching for it
+        for task in tasks:
+            task.cancel()
+
+@router.post("/batch")
+async def verify_batch(request: BatchVerificationRequest):
+    """
+    Verify many transactions at once.
+
+    Items are checked with bounded concurrency through the shared
+    transaction monitor, so repeated txids and confirmed transactions are
+    served from its cache. Results stream back as NDJSON, one line per
+    item in completion order; `index` refers to the position in `items`.
+    """
+    return StreamingResponse(
+        _stream_results(request.items, request.concurrency),
+        media_type="application/x-ndjson",
+    )
+
+async def _resolve_job(request: VerificationJobRequest) -> Dict:
+    """Look up the address (and defaults) a job checks against."""
+    if request.kind == "store":
+        store = await get_store(request.target_id)
+        if not store:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Store not found")
+        amount = request.verification_amount or store.get("verification_amount")
+        if not store.get("btc_address") or not amount or not request.txid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Store verification needs a txid, a Bitcoin address and a verification amount"
+            )
+        return {"txid": request.txid, "address": store["btc_address"], "amount": amount}
+
+    response = await get_review(request.target_id)
+    if response.error:
+        raise HTTPException(status_code=500, detail=response.error)
+    review = response.data
+    if not review:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Review not found")
+    txid = request.txid or review.get("txid")
+    if not txid:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Review has no txid to verify")
+    store = await get_store(review["store_id"])
+    if not store or not store.get("btc_address"):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Associated store not found")
+    return {"txid": txid, "address": store["btc_address"], "amount": request.verification_amount}
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def submit_verification_job(request: VerificationJobRequest):
+    """
+    Queue a verification that is re-checked in the background until the
+    transaction confirms. Poll GET /jobs/{job_id} for the outcome instead
+    of re-submitting to the verify endpoints.
+    """
+    target = await _resolve_job(request)
+    job = get_verification_queue().submit(request.kind, request.target_id, **target)
+    return job.to_dict()
+
+@router.get("/jobs/{job_id}")
+async def get_verification_job(job_id: str):
+    job = get_verification_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Verification job not found")
+    return job.to_dict()
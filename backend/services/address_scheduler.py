@@ -0,0 +1,212 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from infrastructure.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Poll interval bounds per address: idle addresses back off towards the
+# maximum, an address with new activity drops back to the minimum
+ADDRESS_POLL_MIN_SECONDS = float(os.getenv("ADDRESS_POLL_MIN_SECONDS", "30"))
+ADDRESS_POLL_MAX_SECONDS = float(os.getenv("ADDRESS_POLL_MAX_SECONDS", "600"))
+ADDRESS_POLL_BACKOFF = 1.5
+# Polls in flight across all watched addresses
+ADDRESS_POLL_CONCURRENCY = int(os.getenv("ADDRESS_POLL_CONCURRENCY", "8"))
+# Seen txids remembered per address; Esplora returns at most 50 per page
+SEEN_TXIDS_PER_ADDRESS = int(os.getenv("SEEN_TXIDS_PER_ADDRESS", "500"))
+
+
+@dataclass
+class WatchedAddress:
+    address: str
+    callback: Callable[[Dict[str, Any]], Awaitable[Any]]
+    interval: float
+    seen: "OrderedDict[str, None]" = field(default_factory=OrderedDict)
+    # Sequence number of this address's live heap entry; older entries are stale
+    entry: int = -1
+
+
+class AddressScheduler:
+    """
+    Polls any number of watched addresses from one task.
+
+    Addresses sit in a heap ordered by next due time, with at most
+    `concurrency` polls in flight, so outbound request rate is set by the
+    intervals and the cap rather than by how many addresses are watched.
+    Each txid is passed to the address's callback once.
+    """
+
+    def __init__(
+        self,
+        fetch_transactions: Callable[[str], Awaitable[List[Dict[str, Any]]]],
+        min_interval: float = ADDRESS_POLL_MIN_SECONDS,
+        max_interval: float = ADDRESS_POLL_MAX_SECONDS,
+        concurrency: int = ADDRESS_POLL_CONCURRENCY,
+        seen_limit: int = SEEN_TXIDS_PER_ADDRESS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._fetch = fetch_transactions
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.seen_limit = seen_limit
+        self._clock = clock
+        self._watched: Dict[str, WatchedAddress] = {}
+        self._schedule: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._polls: set = set()
+        # While a push feed (AddressStream) is connected, polls are only a
+        # slow backstop at max_interval
+        self.push_active = False
+
+    def __contains__(self, address: str) -> bool:
+        return address in self._watched
+
+    def __len__(self) -> int:
+        return len(self._watched)
+
+    def addresses(self) -> List[str]:
+        return list(self._watched)
+
+    def watch(self, address: str, callback: Callable[[Dict[str, Any]], Awaitable[Any]]) -> bool:
+        """Start watching `address`; returns False if it already was."""
+        if address in self._watched:
+            return False
+        watched = WatchedAddress(address=address, callback=callback, interval=self.min_interval)
+        self._watched[address] = watched
+        # Spread first polls out so a burst of watches does not poll in lockstep
+        self._schedule_poll(watched, self._clock() + random.uniform(0, min(self.min_interval, 1.0)))
+        return True
+
+    def set_push_active(self, active: bool) -> None:
+        if active == self.push_active:
+            return
+        self.push_active = active
+        if not active:
+            # The feed dropped: bring every address back to normal polling soon
+            now = self._clock()
+            for watched in self._watched.values():
+                watched.interval = self.min_interval
+                self._schedule_poll(watched, now + random.uniform(0, self.min_interval))
+
+    async def deliver(self, address: str, tx: Dict[str, Any]) -> bool:
+        """Pass a pushed transaction to the address's callback unless already seen."""
+        watched = self._watched.get(address)
+        if watched is None:
+            return False
+        delivered = await self._deliver(watched, tx)
+        if delivered:
+            metrics.counter("address_new_transactions_total", source="push").inc()
+        return delivered
+
+    async def _deliver(self, watched: WatchedAddress, tx: Dict[str, Any]) -> bool:
+        txid = tx.get("txid")
+        if not txid or txid in watched.seen:
+            return False
+        watched.seen[txid] = None
+        if len(watched.seen) > self.seen_limit:
+            watched.seen.popitem(last=False)
+        try:
+            await watched.callback(tx)
+        except Exception as e:
+            logger.error(f"Callback for {watched.address} failed on {txid}: {str(e)}")
+        return True
+
+    def unwatch(self, address: str) -> bool:
+        # Its heap entry goes stale and is dropped when it comes due
+        return self._watched.pop(address, None) is not None
+
+    def _schedule_poll(self, watched: WatchedAddress, at: float) -> None:
+        watched.entry = next(self._sequence)
+        heapq.heappush(self._schedule, (at, watched.entry, watched.address))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _pop_due(self) -> Tuple[Optional[WatchedAddress], Optional[float]]:
+        """Return the next due address, or the seconds until one is due."""
+        while self._schedule:
+            due, entry, address = self._schedule[0]
+            watched = self._watched.get(address)
+            if watched is None or watched.entry != entry:
+                heapq.heappop(self._schedule)
+                continue
+            wait = due - self._clock()
+            if wait > 0:
+                return None, wait
+            heapq.heappop(self._schedule)
+            return watched, None
+        return None, None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        tasks = [task] if task else []
+        tasks += list(self._polls)
+        for pending in tasks:
+            pending.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._watched.clear()
+        self._schedule.clear()
+
+    async def _run(self) -> None:
+        while True:
+            watched, wait = self._pop_due()
+            if watched is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Hold a slot before starting the poll, so at most `concurrency`
+            # run and due addresses wait their turn in the heap order
+            await self._slots.acquire()
+            task = asyncio.create_task(self._poll(watched))
+            self._polls.add(task)
+            task.add_done_callback(self._polls.discard)
+
+    async def _poll(self, watched: WatchedAddress) -> None:
+        new = 0
+        try:
+            metrics.counter("address_polls_total").inc()
+            transactions = await self._fetch(watched.address)
+            # Oldest first, so callbacks see transactions in order
+            for tx in reversed(transactions or []):
+                if await self._deliver(watched, tx):
+                    new += 1
+        except Exception as e:
+            metrics.counter("address_poll_errors_total").inc()
+            logger.warning(f"Polling {watched.address} failed: {str(e)}")
+        finally:
+            self._slots.release()
+
+        metrics.counter("address_new_transactions_total", source="poll").inc(new)
+        if self.push_active:
+            watched.interval = self.max_interval
+        elif new:
+            watched.interval = self.min_interval
+        else:
+            watched.interval = min(watched.interval * ADDRESS_POLL_BACKOFF, self.max_interval)
+        if self._watched.get(watched.address) is watched:
+            self._schedule_poll(watched, self._clock() + watched.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "watched": len(self._watched),
+            "scheduled": len(self._schedule),
+            "polling": len(self._polls),
+            "push_active": self.push_active,
+        }
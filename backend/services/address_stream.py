@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+import os
+import random
+from typing import Any, Dict, Iterable, Optional
+import aiohttp
+from infrastructure.http_client import get_http_session
+from infrastructure.metrics import metrics
+from services.address_scheduler import AddressScheduler
+
+logger = logging.getLogger(__name__)
+
+# mempool.space-compatible WebSocket feed, e.g. wss://mempool.space/api/v1/ws.
+# Empty (the default) keeps address monitoring on polling only.
+ADDRESS_WS_URL = os.getenv("ADDRESS_WS_URL", "")
+ADDRESS_WS_RECONNECT_MIN_SECONDS = float(os.getenv("ADDRESS_WS_RECONNECT_MIN_SECONDS", "1"))
+ADDRESS_WS_RECONNECT_MAX_SECONDS = float(os.getenv("ADDRESS_WS_RECONNECT_MAX_SECONDS", "60"))
+ADDRESS_WS_HEARTBEAT_SECONDS = float(os.getenv("ADDRESS_WS_HEARTBEAT_SECONDS", "30"))
+
+
+def _addresses_in(tx: Dict[str, Any]) -> Iterable[str]:
+    for vin in tx.get("vin", []):
+        address = (vin.get("prevout") or {}).get("scriptpubkey_address")
+        if address:
+            yield address
+    for vout in tx.get("vout", []):
+        if vout.get("scriptpubkey_address"):
+            yield vout["scriptpubkey_address"]
+
+
+class AddressStream:
+    """
+    Pushes address activity from a mempool-style WebSocket feed into an
+    AddressScheduler.
+
+    Subscribes to every watched address with `track-addresses` and hands
+    each transaction to the scheduler, which de-duplicates it against what
+    polling has already seen. While connected the scheduler only polls as a
+    slow backstop; if the socket drops it goes back to normal polling
+    until the stream reconnects (with exponential backoff and jitter).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        scheduler: AddressScheduler,
+        reconnect_min: float = ADDRESS_WS_RECONNECT_MIN_SECONDS,
+        reconnect_max: float = ADDRESS_WS_RECONNECT_MAX_SECONDS,
+    ):
+        self.url = url
+        self.scheduler = scheduler
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._task: Optional[asyncio.Task] = None
+        self.connects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def resubscribe(self) -> None:
+        """Send the current address set; call after watching or unwatching."""
+        if self.connected:
+            try:
+                await self._ws.send_json({"track-addresses": self.scheduler.addresses()})
+            except (aiohttp.ClientError, ConnectionError) as e:
+                # The receive loop notices the broken socket and reconnects
+                logger.warning(f"Could not update address subscriptions: {str(e)}")
+
+    async def _run(self) -> None:
+        delay = self.reconnect_min
+        while True:
+            try:
+                async with get_http_session().ws_connect(self.url, heartbeat=ADDRESS_WS_HEARTBEAT_SECONDS) as ws:
+                    self._ws = ws
+                    self.connects += 1
+                    await self.resubscribe()
+                    self.scheduler.set_push_active(True)
+                    logger.info(f"Address stream connected to {self.url}")
+                    async for message in ws:
+                        if message.type == aiohttp.WSMsgType.TEXT:
+                            # A working feed resets the backoff
+                            delay = self.reconnect_min
+                            await self._handle(json.loads(message.data))
+                        elif message.type == aiohttp.WSMsgType.ERROR:
+                            break
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Address stream error: {str(e)}")
+            finally:
+                self._ws = None
+                self.scheduler.set_push_active(False)
+
+            metrics.counter("address_stream_reconnects_total").inc()
+            await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+            delay = min(delay * 2, self.reconnect_max)
+
+    async def _handle(self, message: Dict[str, Any]) -> None:
+        # {"multi-address-transactions": {address: {"mempool": [...], "confirmed": [...], "removed": [...]}}}
+        for address, changes in (message.get("multi-address-transactions") or {}).items():
+            for tx in changes.get("mempool", []) + changes.get("confirmed", []):
+                await self.scheduler.deliver(address, tx)
+
+        # Single-address feeds only send the transactions; match them to
+        # watched addresses through their inputs and outputs
+        for key in ("address-transactions", "block-transactions"):
+            for tx in message.get(key) or []:
+                for address in set(_addresses_in(tx)):
+                    await self.scheduler.deliver(address, tx)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"url": self.url, "connected": self.connected, "connects": self.connects}
@@ -1,14 +1,14 @@
-import os
-import requests
+import asyncio
+import aiohttp
 from typing import Optional, Dict
 from dotenv import load_dotenv
+from services.transaction_monitor import get_transaction_monitor
+from services.rate_limit import UpstreamUnavailable
 
 # Load environment variables
 load_dotenv()
 
-MEMPOOL_API_URL = os.getenv('MEMPOOL_API_URL', 'https://mempool.space/api')
-
-def verify_transaction(txid: str, expected_address: str, min_amount: int) -> Dict:
+async def verify_transaction(txid: str, expected_address: str, min_amount: int) -> Dict:
     """
     Verify a Bitcoin transaction using Mempool.space API.
     
@@ -21,16 +21,15 @@ def verify_transaction(txid: str, expected_address: str, min_amount: int) -> Dic
         Dict containing verification status and details
     """
     try:
-        # Get transaction details
-        response = requests.get(f"{MEMPOOL_API_URL}/tx/{txid}")
-        response.raise_for_status()
-        tx_data = response.json()
+        # Get transaction details through the shared, time-bounded client
+        tx_data = await get_transaction_monitor().fetch_transaction(txid)
         
         # Check if transaction is confirmed
         if not tx_data.get('status', {}).get('confirmed'):
             return {
                 'verified': False,
-                'error': 'Transaction not confirmed yet'
+                'error': 'Transaction not confirmed yet',
+                'pending': True
             }
         
         # Check outputs for the expected address and amount
@@ -53,10 +52,16 @@ def verify_transaction(txid: str, expected_address: str, min_amount: int) -> Dic
             'error': 'No matching output found for the expected address'
         }
         
-    except requests.exceptions.RequestException as e:
+    except UpstreamUnavailable as e:
+        return {
+            'verified': False,
+            'error': f'Blockchain API temporarily unavailable: {str(e)}',
+            'retryable': True
+        }
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         return {
             'verified': False,
-            'error': f'Error verifying transaction: {str(e)}'
+            'error': f'Error verifying transaction: {str(e) or type(e).__name__}'
         }
     except Exception as e:
         return {
@@ -0,0 +1,235 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+import aiohttp
+from infrastructure.metrics import metrics
+from services.rate_limit import CircuitBreaker, TokenBucket, RateLimitExceeded, UpstreamUnavailable
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated Esplora-compatible API roots, fastest healthy one first.
+# Falls back to the single MEMPOOL_API_URL.
+MEMPOOL_API_URLS = [
+    url.strip().rstrip("/")
+    for url in os.getenv("MEMPOOL_API_URLS", os.getenv("MEMPOOL_API_URL", "https://mempool.space/api")).split(",")
+    if url.strip()
+]
+# Send a second request to the next provider if the first has not answered
+# within its p95 latency (bounded below by HEDGE_MIN_DELAY_MS)
+HEDGE_REQUESTS = os.getenv("HEDGE_REQUESTS", "true").lower() in ("1", "true", "yes")
+HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "50"))
+# Hedge delay for a provider we have no latency samples for yet
+HEDGE_DEFAULT_DELAY_MS = float(os.getenv("HEDGE_DEFAULT_DELAY_MS", "500"))
+# Consecutive failures (5xx, 429, network) that open a provider's circuit for
+# PROVIDER_COOLDOWN_SECONDS, or longer if a 429 carries a larger Retry-After
+PROVIDER_FAILURE_THRESHOLD = int(os.getenv("PROVIDER_FAILURE_THRESHOLD", "3"))
+PROVIDER_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_COOLDOWN_SECONDS", "30"))
+# Outbound token bucket per provider, shared by every call in the process
+PROVIDER_RATE_PER_SECOND = float(os.getenv("PROVIDER_RATE_PER_SECOND", "5"))
+PROVIDER_BURST = int(os.getenv("PROVIDER_BURST", "10"))
+# Calls allowed to queue for a token before new ones are refused
+PROVIDER_MAX_QUEUED = int(os.getenv("PROVIDER_MAX_QUEUED", "50"))
+
+# Weight of the newest sample in the latency and error-rate moving averages
+EWMA_ALPHA = 0.2
+LATENCY_WINDOW = 100
+
+
+def _retry_after(error: aiohttp.ClientResponseError) -> Optional[float]:
+    try:
+        return float((error.headers or {}).get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ProviderStats:
+    """Latency, error-rate, rate-limit and circuit state for one API root."""
+
+    def __init__(self, url: str, clock: Callable[[], float] = time.monotonic):
+        self.url = url
+        self.latency_ewma_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.latencies_ms: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.successes = 0
+        self.failures = 0
+        self.limiter = TokenBucket(PROVIDER_RATE_PER_SECOND, PROVIDER_BURST, PROVIDER_MAX_QUEUED, clock)
+        self.breaker = CircuitBreaker(url, PROVIDER_FAILURE_THRESHOLD, PROVIDER_COOLDOWN_SECONDS, clock)
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.allows_calls
+
+    def _observe_latency(self, latency_ms: float) -> None:
+        self.latencies_ms.append(latency_ms)
+        if self.latency_ewma_ms is None:
+            self.latency_ewma_ms = latency_ms
+        else:
+            self.latency_ewma_ms += EWMA_ALPHA * (latency_ms - self.latency_ewma_ms)
+
+    def record_success(self, latency_ms: float) -> None:
+        self.successes += 1
+        self.error_rate *= 1 - EWMA_ALPHA
+        self._observe_latency(latency_ms)
+        self.breaker.record_success()
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        self.failures += 1
+        self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+        was_closed = self.breaker.state == CircuitBreaker.CLOSED
+        self.breaker.record_failure(retry_after)
+        if was_closed and self.breaker.state == CircuitBreaker.OPEN:
+            logger.warning(f"Provider {self.url} circuit opened after {self.breaker.consecutive_failures} failures")
+
+    def record_abandoned(self, elapsed_ms: float) -> None:
+        # Lost a hedge race: its latency is at least this long, which keeps a
+        # slow provider from looking untested (and so fastest) forever
+        self._observe_latency(elapsed_ms)
+
+    def p95_ms(self) -> Optional[float]:
+        if not self.latencies_ms:
+            return None
+        ordered = sorted(self.latencies_ms)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def score(self) -> float:
+        # Expected latency, inflated by the chance of having to retry elsewhere.
+        # Untested providers score 0 so they get probed.
+        latency = self.latency_ewma_ms or 0.0
+        return latency / max(1 - self.error_rate, 0.05)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "latency_ewma_ms": self.latency_ewma_ms,
+            "p95_ms": self.p95_ms(),
+            "error_rate": self.error_rate,
+            "successes": self.successes,
+            "failures": self.failures,
+            "circuit": self.breaker.stats(),
+            "rate_limit": self.limiter.stats(),
+        }
+
+
+class ProviderPool:
+    """
+    Send each request to the best-scoring healthy provider, hedge to the
+    next one after the primary's p95 latency, and fail over on errors.
+    The first successful answer wins; the other attempt is cancelled.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        hedge: bool = HEDGE_REQUESTS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not urls:
+            raise ValueError("At least one provider URL is required")
+        self.providers = [ProviderStats(url.rstrip("/"), clock) for url in urls]
+        self.hedge = hedge
+
+    @property
+    def primary_url(self) -> str:
+        return self.ranked()[0].url
+
+    def ranked(self) -> List[ProviderStats]:
+        # Stable sort, so ties keep the configured order
+        return sorted(self.providers, key=lambda provider: (not provider.healthy, provider.score()))
+
+    def hedge_delay(self, provider: ProviderStats) -> float:
+        p95 = provider.p95_ms()
+        delay_ms = HEDGE_DEFAULT_DELAY_MS if p95 is None else max(p95, HEDGE_MIN_DELAY_MS)
+        return delay_ms / 1000
+
+    async def _attempt(self, provider: ProviderStats, fetch: Callable[[str], Awaitable[Any]]) -> Any:
+        try:
+            provider.breaker.before_call()
+        except UpstreamUnavailable:
+            metrics.counter("blockchain_provider_requests_total", provider=provider.url, outcome="circuit_open").inc()
+            raise
+        try:
+            waited = await provider.limiter.acquire()
+        except RateLimitExceeded:
+            provider.breaker.release()
+            metrics.counter("blockchain_provider_requests_total", provider=provider.url, outcome="rate_limited").inc()
+            raise
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            raise
+        metrics.histogram("blockchain_rate_limit_wait_ms", provider=provider.url).observe(waited * 1000)
+
+        started = time.perf_counter()
+        try:
+            result = await fetch(provider.url)
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            raise
+        except aiohttp.ClientResponseError as e:
+            if e.status >= 500 or e.status == 429:
+                provider.record_failure(_retry_after(e))
+            else:
+                # The provider answered; it just does not have what we asked for
+                provider.record_success((time.perf_counter() - started) * 1000)
+            metrics.counter("blockchain_provider_requests_total", provider=provider.url, outcome="error").inc()
+            raise
+        except Exception:
+            provider.record_failure()
+            metrics.counter("blockchain_provider_requests_total", provider=provider.url, outcome="error").inc()
+            raise
+        provider.record_success((time.perf_counter() - started) * 1000)
+        metrics.counter("blockchain_provider_requests_total", provider=provider.url, outcome="ok").inc()
+        return result
+
+    async def request(self, fetch: Callable[[str], Awaitable[Any]]) -> Any:
+        """
+        Run `fetch(base_url)` against the pool and return the first success.
+
+        If every provider fails, the last error is raised.
+        """
+        candidates = self.ranked()
+        # Attempt task -> (provider, start time)
+        pending: Dict[asyncio.Task, Tuple[ProviderStats, float]] = {}
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        def launch() -> None:
+            provider = candidates.pop(0)
+            pending[asyncio.ensure_future(self._attempt(provider, fetch))] = (provider, time.perf_counter())
+
+        launch()
+        try:
+            while pending:
+                timeout = None
+                if self.hedge and not hedged and candidates and len(pending) == 1:
+                    timeout = self.hedge_delay(next(iter(pending.values()))[0])
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    hedged = True
+                    metrics.counter("blockchain_hedged_requests_total").inc()
+                    launch()
+                    continue
+                for task in done:
+                    del pending[task]
+                    if task.exception() is None:
+                        return task.result()
+                    # Prefer an upstream answer (e.g. 404) over a local refusal
+                    if last_error is None or not isinstance(task.exception(), UpstreamUnavailable):
+                        last_error = task.exception()
+                if not pending and candidates:
+                    # Fail over to the next provider
+                    launch()
+            raise last_error
+        finally:
+            # Recorded here rather than in the cancelled task so the next
+            # request already ranks the loser accordingly
+            for task, (provider, started) in pending.items():
+                task.cancel()
+                provider.record_abandoned((time.perf_counter() - started) * 1000)
+                metrics.counter("blockchain_provider_requests_total", provider=provider.url, outcome="abandoned").inc()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [provider.snapshot() for provider in self.providers]
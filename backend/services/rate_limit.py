@@ -0,0 +1,143 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+
+class UpstreamUnavailable(Exception):
+    """An outbound call was refused locally to protect the upstream API."""
+
+
+class RateLimitExceeded(UpstreamUnavailable):
+    pass
+
+
+class CircuitOpenError(UpstreamUnavailable):
+    pass
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` calls per second with bursts of up to `burst`.
+
+    Callers that find the bucket empty wait their turn in arrival order
+    (each reserves the next free slot); once `max_waiters` are already
+    waiting, acquire() raises RateLimitExceeded instead of queueing.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_waiters: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Any] = asyncio.sleep,
+    ):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.max_waiters = max_waiters
+        self._clock = clock
+        self._sleep = sleep
+        self._interval = 1 / rate
+        # Theoretical arrival time of the next call (GCRA)
+        self._next_slot = clock()
+        self.waiting = 0
+        self.rejected = 0
+
+    async def acquire(self) -> float:
+        """Wait for a token; returns the seconds spent waiting."""
+        now = self._clock()
+        slot = max(self._next_slot, now)
+        delay = slot - (self.burst - 1) * self._interval - now
+        if delay > 0 and self.waiting >= self.max_waiters:
+            self.rejected += 1
+            raise RateLimitExceeded(f"Outbound rate limit queue is full ({self.max_waiters} waiting)")
+        # Reserve the slot before sleeping so later callers queue behind us
+        self._next_slot = slot + self._interval
+        if delay <= 0:
+            return 0.0
+        self.waiting += 1
+        try:
+            await self._sleep(delay)
+        finally:
+            self.waiting -= 1
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        return {"rate": self.rate, "burst": self.burst, "waiting": self.waiting, "rejected": self.rejected}
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; while
+    open, calls fail fast with CircuitOpenError. After `reset_timeout`
+    seconds one probe call is let through (half-open): success closes the
+    circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._opened_until = 0.0
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and self._clock() >= self._opened_until:
+            return self.HALF_OPEN
+        return self._state
+
+    @property
+    def allows_calls(self) -> bool:
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probe_in_flight)
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == self.CLOSED:
+            return
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return
+        self.rejected += 1
+        retry_in = max(self._opened_until - self._clock(), 0.0)
+        raise CircuitOpenError(f"{self.name} is unavailable (circuit open, retry in {retry_in:.0f}s)")
+
+    def record_success(self) -> None:
+        self._state = self.CLOSED
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+
+    def record_failure(self, retry_after: Optional[float] = None) -> None:
+        self.consecutive_failures += 1
+        if self._probe_in_flight or self.consecutive_failures >= self.failure_threshold or retry_after:
+            self.trip(retry_after)
+
+    def release(self) -> None:
+        """The call neither succeeded nor failed (e.g. it was cancelled)."""
+        self._probe_in_flight = False
+
+    def trip(self, retry_after: Optional[float] = None) -> None:
+        self._state = self.OPEN
+        self._probe_in_flight = False
+        self._opened_until = self._clock() + max(self.reset_timeout, retry_after or 0.0)
+        self.times_opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
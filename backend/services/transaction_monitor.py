@@ -1,11 +1,19 @@
 import aiohttp
 import asyncio
+import copy
 import logging
 from typing import Optional, Dict, Any, Callable, List
 import os
 from dotenv import load_dotenv
 import random
 import time
+from infrastructure.http_client import get_http_session
+from infrastructure.metrics import metrics
+from services.tx_cache import TransactionCache
+from services.blockchain_providers import ProviderPool, MEMPOOL_API_URLS
+from services.rate_limit import UpstreamUnavailable
+from services.address_scheduler import AddressScheduler
+from services.address_stream import AddressStream, ADDRESS_WS_URL
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,10 +21,30 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Bounds on a single mempool API call so a slow upstream cannot pin a request
+MEMPOOL_CONNECT_TIMEOUT_SECONDS = float(os.getenv("MEMPOOL_CONNECT_TIMEOUT_SECONDS", "5"))
+MEMPOOL_READ_TIMEOUT_SECONDS = float(os.getenv("MEMPOOL_READ_TIMEOUT_SECONDS", "10"))
+
+def _upstream_unavailable(error: UpstreamUnavailable) -> Dict[str, Any]:
+    return {
+        'verified': False,
+        'error': f'Blockchain API temporarily unavailable: {error}',
+        'retryable': True
+    }
+
 class TransactionMonitor:
-    def __init__(self):
-        self.mempool_api_url = os.getenv("MEMPOOL_API_URL", "https://mempool.space/api")
-        self._monitoring_tasks = {}
+    def __init__(self, api_urls: Optional[List[str]] = None):
+        self.providers = ProviderPool(api_urls or MEMPOOL_API_URLS)
+        self.timeout = aiohttp.ClientTimeout(
+            sock_connect=MEMPOOL_CONNECT_TIMEOUT_SECONDS,
+            sock_read=MEMPOOL_READ_TIMEOUT_SECONDS,
+        )
+        self.tx_cache = TransactionCache()
+        # Upstream lookups in flight, keyed by txid, shared by concurrent callers
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self.address_scheduler = AddressScheduler(self._fetch_address_transactions)
+        # Optional push feed; polling remains the fallback
+        self.address_stream = AddressStream(ADDRESS_WS_URL, self.address_scheduler) if ADDRESS_WS_URL else None
 
     def _generate_verification_amount(self) -> int:
         """Generate a random verification amount between 1000 and 5000 sats."""
@@ -26,26 +54,72 @@ class TransactionMonitor:
         """Get a new verification amount for each store."""
         return self._generate_verification_amount()
 
+    async def fetch_transaction(self, txid: str) -> Dict[str, Any]:
+        """
+        Get transaction details from the cache or the Bitcoin API.
+
+        Raises aiohttp.ClientResponseError for non-2xx responses and
+        aiohttp.ClientError or asyncio.TimeoutError if the API is unreachable.
+        """
+        cached = await self.tx_cache.get(txid)
+        if cached is not None:
+            return cached
+
+        # Single flight: concurrent lookups of one txid share one upstream call
+        task = self._inflight.get(txid)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_upstream(txid))
+            self._inflight[txid] = task
+            task.add_done_callback(lambda done: self._forget_inflight(txid, done))
+        else:
+            metrics.counter("mempool_coalesced_lookups_total").inc()
+        # Shielded so one caller giving up does not cancel the others' lookup
+        return copy.deepcopy(await asyncio.shield(task))
+
+    @property
+    def mempool_api_url(self) -> str:
+        return self.providers.primary_url
+
+    async def _get_json(self, path: str) -> Any:
+        """GET `path` from the provider pool; raises like fetch_transaction."""
+        async def fetch(base_url: str) -> Any:
+            async with get_http_session().get(f"{base_url}{path}", timeout=self.timeout) as response:
+                response.raise_for_status()
+                return await response.json()
+
+        return await self.providers.request(fetch)
+
+    async def _fetch_upstream(self, txid: str) -> Dict[str, Any]:
+        metrics.counter("mempool_upstream_requests_total").inc()
+        tx_data = await self._get_json(f"/tx/{txid}")
+        await self.tx_cache.set(txid, tx_data)
+        return tx_data
+
+    def _forget_inflight(self, txid: str, task: asyncio.Task) -> None:
+        if self._inflight.get(txid) is task:
+            del self._inflight[txid]
+        # Mark the outcome as retrieved even if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
     async def get_transaction(self, txid: str) -> Optional[Dict[str, Any]]:
         """
-        Get transaction details from the Bitcoin API.
+        Get transaction details from the Bitcoin API, or None on any failure.
+
+        UpstreamUnavailable (rate limit queue full, circuit open) is raised
+        rather than reported as a missing transaction.
         """
         print(f"Fetching transaction details for txid: {txid}")
-        url = f"{self.mempool_api_url}/tx/{txid}"
-        print(f"API URL: {url}")
         
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url) as response:
-                    print(f"API Response status: {response.status}")
-                    if response.status == 200:
-                        data = await response.json()
-                        print(f"Transaction data received: {data}")
-                        return data
-                    else:
-                        error_text = await response.text()
-                        print(f"API Error: Status {response.status}, Response: {error_text}")
-                        return None
+            data = await self.fetch_transaction(txid)
+            print(f"Transaction data received: {data}")
+            return data
+        except UpstreamUnavailable:
+            raise
+        except aiohttp.ClientResponseError as e:
+            print(f"API Error: Status {e.status}, Response: {e.message}")
+            return None
         except Exception as e:
             print(f"Exception while fetching transaction: {str(e)}")
             return None
@@ -60,7 +134,10 @@ class TransactionMonitor:
         print(f"Expected address: {expected_address}")
         print(f"Required verification amount: {verification_amount} sats")
         
-        tx_data = await self.get_transaction(txid)
+        try:
+            tx_data = await self.get_transaction(txid)
+        except UpstreamUnavailable as e:
+            return _upstream_unavailable(e)
         if not tx_data:
             print("Transaction data not found")
             return {
@@ -73,7 +150,8 @@ class TransactionMonitor:
             print("Transaction is not confirmed")
             return {
                 'verified': False,
-                'error': 'Transaction not confirmed yet'
+                'error': 'Transaction not confirmed yet',
+                'pending': True
             }
 
         print("\nChecking transaction inputs and outputs:")
@@ -115,7 +193,10 @@ class TransactionMonitor:
         print(f"Expected store address: {store_address}")
         print(f"Expected verification amount: {verification_amount}")
         
-        tx_data = await self.get_transaction(txid)
+        try:
+            tx_data = await self.get_transaction(txid)
+        except UpstreamUnavailable as e:
+            return _upstream_unavailable(e)
         if not tx_data:
             print(f"Transaction not found or invalid for txid: {txid}")
             return {
@@ -130,7 +211,8 @@ class TransactionMonitor:
             print(f"Transaction {txid} is not confirmed yet")
             return {
                 'verified': False,
-                'error': 'Transaction not confirmed yet'
+                'error': 'Transaction not confirmed yet',
+                'pending': True
             }
 
         print("Transaction is confirmed, checking outputs...")
@@ -170,52 +252,58 @@ class TransactionMonitor:
             'error': 'No valid payment found to the store address'
         }
 
+    async def _fetch_address_transactions(self, address: str) -> List[Dict[str, Any]]:
+        return await self._get_json(f"/address/{address}/txs")
+
     async def monitor_address(self, address: str, callback: Callable):
         """
         Monitor an address for new transactions.
-        This is a basic implementation that polls the API every 30 seconds.
-        In production, you might want to use WebSocket or a more efficient method.
+        Every watched address shares one scheduler (see AddressScheduler),
+        fed by the WebSocket stream when ADDRESS_WS_URL is set, and
+        `callback` is awaited once per new transaction.
         """
-        if address in self._monitoring_tasks:
+        if not self.address_scheduler.watch(address, callback):
             logger.warning(f"Already monitoring address {address}")
             return
-
-        async def _monitor():
-            last_txid = None
-            while True:
-                try:
-                    async with aiohttp.ClientSession() as session:
-                        async with session.get(f"{self.mempool_api_url}/address/{address}/txs") as response:
-                            if response.status == 200:
-                                transactions = await response.json()
-                                for tx in transactions:
-                                    txid = tx.get('txid')
-                                    if txid and txid != last_txid:
-                                        last_txid = txid
-                                        await callback(tx)
-                            else:
-                                logger.warning(f"Failed to fetch transactions for {address}: Status {response.status}")
-                except aiohttp.ClientError as e:
-                    logger.error(f"Network error monitoring address {address}: {str(e)}")
-                except Exception as e:
-                    logger.error(f"Unexpected error monitoring address {address}: {str(e)}")
-                
-                await asyncio.sleep(30)  # Poll every 30 seconds
-
-        task = asyncio.create_task(_monitor())
-        self._monitoring_tasks[address] = task
+        await self.address_scheduler.start()
+        if self.address_stream is not None:
+            await self.address_stream.start()
+            await self.address_stream.resubscribe()
         logger.info(f"Started monitoring address {address}")
 
     def stop_monitoring(self, address: str):
         """Stop monitoring a specific address."""
-        if address in self._monitoring_tasks:
-            self._monitoring_tasks[address].cancel()
-            del self._monitoring_tasks[address]
+        if self.address_scheduler.unwatch(address):
+            if self.address_stream is not None:
+                asyncio.ensure_future(self.address_stream.resubscribe())
             logger.info(f"Stopped monitoring address {address}")
 
     def stop_all_monitoring(self):
         """Stop monitoring all addresses."""
-        for address, task in self._monitoring_tasks.items():
-            task.cancel()
-            logger.info(f"Stopped monitoring address {address}")
-        self._monitoring_tasks.clear() 
\ No newline at end of file
+        for address in self.address_scheduler.addresses():
+            self.stop_monitoring(address)
+
+
+_transaction_monitor: Optional[TransactionMonitor] = None
+
+
+def get_transaction_monitor() -> TransactionMonitor:
+    """Return the process-wide monitor shared by store and review verification."""
+    global _transaction_monitor
+    if _transaction_monitor is None:
+        _transaction_monitor = TransactionMonitor()
+        metrics.register_collector("tx_cache", _transaction_monitor.tx_cache.stats)
+        metrics.register_collector("blockchain_providers", _transaction_monitor.providers.stats)
+        metrics.register_collector("address_monitor", _transaction_monitor.address_scheduler.stats)
+        if _transaction_monitor.address_stream is not None:
+            metrics.register_collector("address_stream", _transaction_monitor.address_stream.stats)
+    return _transaction_monitor
+
+
+async def close_transaction_monitor() -> None:
+    """Stop address polling and release the transaction cache on shutdown."""
+    if _transaction_monitor is not None:
+        if _transaction_monitor.address_stream is not None:
+            await _transaction_monitor.address_stream.stop()
+        await _transaction_monitor.address_scheduler.stop()
+        await _transaction_monitor.tx_cache.close()
@@ -0,0 +1,117 @@
+import asyncio
+import copy
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from infrastructure.cache import TTLCache
+
+# Process memory tier size, in transactions
+TX_CACHE_SIZE = int(os.getenv("TX_CACHE_SIZE", "4096"))
+# Unconfirmed transactions can still confirm (or be replaced), so they are
+# only reused briefly and never written to disk
+TX_CACHE_UNCONFIRMED_TTL_SECONDS = float(os.getenv("TX_CACHE_UNCONFIRMED_TTL_SECONDS", "30"))
+# SQLite file for confirmed transactions; set to an empty string to disable
+TX_CACHE_PATH = os.getenv("TX_CACHE_PATH", "tx_cache.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    txid TEXT PRIMARY KEY,
+    doc TEXT NOT NULL,
+    cached_at REAL NOT NULL
+);
+"""
+
+
+def is_confirmed(tx: Dict[str, Any]) -> bool:
+    return bool(tx.get("status", {}).get("confirmed"))
+
+
+class TransactionCache:
+    """
+    Two-tier cache of mempool /tx/{txid} responses.
+
+    A confirmed transaction never changes, so it is kept in memory (LRU)
+    without expiry and persisted to SQLite, which survives restarts.
+    Unconfirmed transactions only live in memory for a short TTL.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = TX_CACHE_PATH,
+        max_size: int = TX_CACHE_SIZE,
+        unconfirmed_ttl: float = TX_CACHE_UNCONFIRMED_TTL_SECONDS,
+    ):
+        self.path = path or None
+        self.unconfirmed_ttl = unconfirmed_ttl
+        self._memory = TTLCache(max_size=max_size, ttl=float("inf"))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        # Opened on first use so importing the monitor never touches the disk
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def _read_disk(self, txid: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._connection().execute("SELECT doc FROM transactions WHERE txid = ?", (txid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _write_disk(self, txid: str, tx: Dict) -> None:
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO transactions VALUES (?, ?, ?)",
+                (txid, json.dumps(tx, separators=(",", ":")), time.time()),
+            )
+
+    async def get(self, txid: str) -> Optional[Dict]:
+        tx = self._memory.get(txid)
+        if tx is not None:
+            self.memory_hits += 1
+            return copy.deepcopy(tx)
+        if self.path:
+            tx = await asyncio.to_thread(self._read_disk, txid)
+            if tx is not None:
+                self.disk_hits += 1
+                self._memory.set(txid, tx)
+                return copy.deepcopy(tx)
+        self.misses += 1
+        return None
+
+    async def set(self, txid: str, tx: Dict) -> None:
+        if not is_confirmed(tx):
+            self._memory.set(txid, copy.deepcopy(tx), ttl=self.unconfirmed_ttl)
+            return
+        self._memory.set(txid, copy.deepcopy(tx))
+        if self.path:
+            await asyncio.to_thread(self._write_disk, txid, tx)
+
+    def _close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._close)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_size": len(self._memory),
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "evictions": self._memory.evictions,
+        }
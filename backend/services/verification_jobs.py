@@ -0,0 +1,234 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from infrastructure.cache import TTLCache
+from infrastructure.metrics import metrics
+from services.transaction_monitor import TransactionMonitor, get_transaction_monitor
+import cosmos_repository
+
+logger = logging.getLogger(__name__)
+
+VERIFICATION_WORKERS = int(os.getenv("VERIFICATION_WORKERS", "4"))
+# First re-check delay for an unconfirmed transaction; doubles per attempt
+# up to VERIFICATION_MAX_RECHECK_SECONDS (about one block)
+VERIFICATION_RECHECK_SECONDS = float(os.getenv("VERIFICATION_RECHECK_SECONDS", "60"))
+VERIFICATION_MAX_RECHECK_SECONDS = float(os.getenv("VERIFICATION_MAX_RECHECK_SECONDS", "600"))
+# Give up on a transaction that has not confirmed after this long
+VERIFICATION_JOB_MAX_AGE_SECONDS = float(os.getenv("VERIFICATION_JOB_MAX_AGE_SECONDS", str(24 * 3600)))
+# Finished jobs stay queryable for this long
+VERIFICATION_JOB_RETENTION_SECONDS = float(os.getenv("VERIFICATION_JOB_RETENTION_SECONDS", str(24 * 3600)))
+
+PENDING = "pending"
+VERIFIED = "verified"
+FAILED = "failed"
+EXPIRED = "expired"
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class VerificationJob:
+    kind: str  # "store" or "review"
+    target_id: str
+    txid: str
+    address: str
+    amount: Optional[int] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: str = PENDING
+    attempts: int = 0
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+    created_at: str = field(default_factory=_now_iso)
+    updated_at: str = field(default_factory=_now_iso)
+    # Monotonic bookkeeping, not part of the public shape
+    submitted_at: float = 0.0
+    next_check_at: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "target_id": self.target_id,
+            "txid": self.txid,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "result": self.result,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+class VerificationJobQueue:
+    """
+    Re-checks submitted verifications in the background until the
+    transaction confirms, then marks the store or review verified.
+
+    A scheduler task keeps pending jobs in a heap ordered by next check
+    time and hands due ones to a small worker pool. Jobs live in process
+    memory: a restart drops pending jobs, and clients resubmit.
+    """
+
+    def __init__(
+        self,
+        monitor: Optional[TransactionMonitor] = None,
+        workers: int = VERIFICATION_WORKERS,
+        recheck_interval: float = VERIFICATION_RECHECK_SECONDS,
+        max_recheck_interval: float = VERIFICATION_MAX_RECHECK_SECONDS,
+        max_age: float = VERIFICATION_JOB_MAX_AGE_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.monitor = monitor or get_transaction_monitor()
+        self.workers = workers
+        self.recheck_interval = recheck_interval
+        self.max_recheck_interval = max_recheck_interval
+        self.max_age = max_age
+        self._clock = clock
+        self._pending: Dict[str, VerificationJob] = {}
+        self._finished = TTLCache(max_size=100000, ttl=VERIFICATION_JOB_RETENTION_SECONDS)
+        # (kind, target_id, txid) -> pending job id, so resubmissions join it
+        self._by_key: Dict[Tuple[str, str, str], str] = {}
+        self._schedule: List[Tuple[float, int, str]] = []
+        self._sequence = itertools.count()
+        self._ready: Optional[asyncio.Queue] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._ready = asyncio.Queue()
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._scheduler())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        # Jobs submitted before start() are already in the heap
+        self._wakeup.set()
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def submit(self, kind: str, target_id: str, txid: str, address: str, amount: Optional[int] = None) -> VerificationJob:
+        key = (kind, target_id, txid)
+        existing = self._by_key.get(key)
+        if existing in self._pending:
+            return self._pending[existing]
+
+        job = VerificationJob(kind=kind, target_id=target_id, txid=txid, address=address, amount=amount)
+        job.submitted_at = self._clock()
+        self._pending[job.id] = job
+        self._by_key[key] = job.id
+        metrics.counter("verification_jobs_total", outcome="submitted").inc()
+        self._schedule_check(job, job.submitted_at)
+        return job
+
+    def get(self, job_id: str) -> Optional[VerificationJob]:
+        return self._pending.get(job_id) or self._finished.get(job_id)
+
+    def _schedule_check(self, job: VerificationJob, at: float) -> None:
+        job.next_check_at = at
+        heapq.heappush(self._schedule, (at, next(self._sequence), job.id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _scheduler(self) -> None:
+        while True:
+            now = self._clock()
+            while self._schedule and self._schedule[0][0] <= now:
+                _, _, job_id = heapq.heappop(self._schedule)
+                if job_id in self._pending:
+                    self._ready.put_nowait(job_id)
+            timeout = self._schedule[0][0] - now if self._schedule else None
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._ready.get()
+            job = self._pending.get(job_id)
+            if job is None:
+                continue
+            try:
+                await self.check(job)
+            except Exception as e:
+                # Keep the worker alive; the job is retried on its schedule
+                logger.error(f"Verification job {job.id} check failed: {str(e)}")
+                self._reschedule(job, str(e))
+
+    async def _verify(self, job: VerificationJob) -> Dict[str, Any]:
+        if job.kind == "store":
+            return await self.monitor.verify_store_transaction(job.txid, job.address, job.amount)
+        return await self.monitor.verify_review_transaction(job.txid, job.address, job.amount)
+
+    async def _finalize(self, job: VerificationJob, result: Dict[str, Any]) -> Optional[str]:
+        """Mark the target verified; returns an error message on failure."""
+        if job.kind == "store":
+            updated = await cosmos_repository.update_store(job.target_id, {
+                "verified": True,
+                "verification_txid": job.txid,
+                "verification_amount": result.get("amount"),
+            })
+            return None if updated else "Store not found"
+        response = await cosmos_repository.update_review(job.target_id, {"verified": True})
+        return response.error
+
+    async def check(self, job: VerificationJob) -> None:
+        """Check one job now and move it to its next state."""
+        job.attempts += 1
+        result = await self._verify(job)
+        job.result = result
+
+        if result.get("verified"):
+            error = await self._finalize(job, result)
+            self._finish(job, FAILED if error else VERIFIED, error)
+        elif result.get("pending") or result.get("retryable"):
+            self._reschedule(job, result.get("error"))
+        else:
+            self._finish(job, FAILED, result.get("error"))
+
+    def _reschedule(self, job: VerificationJob, error: Optional[str]) -> None:
+        now = self._clock()
+        job.error = error
+        job.updated_at = _now_iso()
+        if now - job.submitted_at >= self.max_age:
+            self._finish(job, EXPIRED, "Transaction did not confirm in time")
+            return
+        delay = min(self.recheck_interval * 2 ** (job.attempts - 1), self.max_recheck_interval)
+        self._schedule_check(job, now + delay)
+
+    def _finish(self, job: VerificationJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.updated_at = _now_iso()
+        self._pending.pop(job.id, None)
+        self._by_key.pop((job.kind, job.target_id, job.txid), None)
+        self._finished.set(job.id, job)
+        metrics.counter("verification_jobs_total", outcome=status).inc()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"pending": len(self._pending), "ready": self._ready.qsize() if self._ready else 0}
+
+
+_verification_queue: Optional[VerificationJobQueue] = None
+
+
+def get_verification_queue() -> VerificationJobQueue:
+    global _verification_queue
+    if _verification_queue is None:
+        _verification_queue = VerificationJobQueue()
+        metrics.register_collector("verification_jobs", _verification_queue.stats)
+    return _verification_queue
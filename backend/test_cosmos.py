@@ -2,18 +2,19 @@
 Test script for CosmosDB integration.
 Renamed from test_supabase.py - now tests Azure CosmosDB.
 """
+import asyncio
 import os
 from dotenv import load_dotenv
 from cosmos_repository import get_stores, get_store, create_store, update_store, get_reviews, create_review
 
 
-def main():
+async def main():
     # Load environment variables
     load_dotenv()
     
     # Test get_stores
     print("\nTesting get_stores():")
-    stores = get_stores()
+    stores = await get_stores()
     print(f"Found {len(stores)} stores")
     
     # Test create_store
@@ -23,7 +24,7 @@ def main():
         "description": "A test store created via CosmosDB",
         "btc_address": "bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh"
     }
-    created_store = create_store(new_store)
+    created_store = await create_store(new_store)
     print(f"Created store: {created_store}")
     
     if created_store:
@@ -31,7 +32,7 @@ def main():
         
         # Test get_store
         print("\nTesting get_store():")
-        store = get_store(store_id)
+        store = await get_store(store_id)
         print(f"Retrieved store: {store}")
         
         # Test update_store
@@ -39,7 +40,7 @@ def main():
         update_data = {
             "description": "Updated test store description"
         }
-        updated_store = update_store(store_id, update_data)
+        updated_store = await update_store(store_id, update_data)
         print(f"Updated store: {updated_store}")
         
         # Test create_review
@@ -50,12 +51,12 @@ def main():
             "comment": "Great test store!",
             "txid": "a1b2c3d4e5f6g7h8i9j0a1b2c3d4e5f6g7h8i9j0a1b2c3d4e5f6g7h8i9j01234"
         }
-        created_review = create_review(review_data)
+        created_review = await create_review(review_data)
         print(f"Created review: {created_review}")
         
         # Test get_reviews
         print("\nTesting get_reviews():")
-        reviews = get_reviews(store_id)
+        reviews = await get_reviews(store_id)
         print(f"Reviews for store {store_id}: {reviews}")
 
 
@@ -67,7 +68,7 @@ def test_get_reviews_for_store():
     print(f"\nFetching reviews for store: {store_id}")
     
     try:
-        response = get_reviews(store_id)
+        response = asyncio.run(get_reviews(store_id))
         print(f"Response: {response}")
         return response.data if response.data else []
     except Exception as e:
@@ -76,6 +77,6 @@ def test_get_reviews_for_store():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
     reviews = test_get_reviews_for_store()
     print("\nReviews:", reviews) 
\ No newline at end of file
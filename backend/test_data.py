@@ -1,3 +1,4 @@
+import asyncio
 from cosmos_repository import create_store, create_review
 
 # Test stores data
@@ -36,12 +37,12 @@ test_reviews = [
     }
 ]
 
-def insert_test_data():
+async def insert_test_data():
     try:
         # Insert stores
         store_responses = []
         for store in test_stores:
-            response = create_store(store)
+            response = await create_store(store)
             if response:
                 store_responses.append(response)
                 print(f"Created store: {response['name']}")
@@ -52,7 +53,7 @@ def insert_test_data():
         for i, review in enumerate(test_reviews):
             if i < len(store_responses):
                 review["store_id"] = store_responses[i]["id"]
-                response = create_review(review)
+                response = await create_review(review)
                 if response:
                     print(f"Created review for store: {store_responses[i]['name']}")
                 else:
@@ -64,4 +65,4 @@ def insert_test_data():
         print(f"Error inserting test data: {str(e)}")
 
 if __name__ == "__main__":
-    insert_test_data() 
\ No newline at end of file
+    asyncio.run(insert_test_data()) 
\ No newline at end of file
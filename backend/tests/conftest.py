@@ -1,6 +1,10 @@
+import asyncio
 import pytest
 from fastapi.testclient import TestClient
 from main import app
+from infrastructure.storage_engine import set_storage_engine
+from infrastructure.sqlite_engine import SqliteStorageEngine
+import cosmos_repository
 
 @pytest.fixture
 def client():
@@ -26,4 +30,15 @@ def test_review():
         "comment": "Great test store!",
         "txid": "a1b2c3d4e5f6g7h8i9j0k1l2m3n4o5p6q7r8s9t0u1v2w3x4y5z6",
         "verified": False
-    } 
\ No newline at end of file
+    } 
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """Route cosmos_repository through a throwaway SQLite database"""
+    engine = SqliteStorageEngine(str(tmp_path / "test.db"))
+    set_storage_engine(engine)
+    cosmos_repository.store_cache.clear()
+    yield engine
+    set_storage_engine(None)
+    cosmos_repository.store_cache.clear()
+    asyncio.run(engine.close())
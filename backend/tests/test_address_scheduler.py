@@ -0,0 +1,91 @@
+import asyncio
+from services.address_scheduler import AddressScheduler
+
+
+def tx(txid):
+    return {"txid": txid}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_each_transaction_reaches_the_callback_once():
+    # Newest first, like Esplora; a new transaction appears on the third poll
+    pages = [[tx("b"), tx("a")], [tx("b"), tx("a")], [tx("c"), tx("b"), tx("a")]]
+    seen = []
+
+    async def fetch(address):
+        return pages.pop(0) if len(pages) > 1 else pages[0]
+
+    async def callback(transaction):
+        seen.append(transaction["txid"])
+
+    async def scenario():
+        scheduler = AddressScheduler(fetch, min_interval=0.01, max_interval=0.02)
+        scheduler.watch("addr", callback)
+        await scheduler.start()
+        await asyncio.sleep(0.3)
+        await scheduler.stop()
+
+    run(scenario())
+    assert seen == ["a", "b", "c"]
+
+
+def test_idle_addresses_back_off_and_activity_resets_interval():
+    results = {"busy": 0}
+
+    async def fetch(address):
+        if address == "busy":
+            results["busy"] += 1
+            return [tx(f"busy-{results['busy']}")]
+        return []
+
+    async def noop(transaction):
+        pass
+
+    async def scenario():
+        scheduler = AddressScheduler(fetch, min_interval=0.01, max_interval=1.0)
+        scheduler.watch("idle", noop)
+        scheduler.watch("busy", noop)
+        await scheduler.start()
+        await asyncio.sleep(0.3)
+        intervals = {address: scheduler._watched[address].interval for address in ("idle", "busy")}
+        await scheduler.stop()
+        return intervals
+
+    intervals = run(scenario())
+    assert intervals["busy"] == 0.01
+    assert intervals["idle"] > 0.05
+
+
+def test_concurrency_cap_holds_for_many_addresses():
+    in_flight = []
+    peak = []
+    polled = set()
+
+    async def fetch(address):
+        in_flight.append(address)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(address)
+        polled.add(address)
+        return []
+
+    async def noop(transaction):
+        pass
+
+    async def scenario():
+        scheduler = AddressScheduler(fetch, min_interval=10, concurrency=5)
+        for n in range(200):
+            scheduler.watch(f"addr-{n}", noop)
+        assert not scheduler.watch("addr-0", noop)
+        scheduler.unwatch("addr-199")
+        await scheduler.start()
+        await asyncio.sleep(1.5)
+        await scheduler.stop()
+
+    run(scenario())
+    assert max(peak) <= 5
+    assert len(polled) == 199
+    assert "addr-199" not in polled
@@ -0,0 +1,113 @@
+import asyncio
+import json
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from infrastructure.http_client import close_http_session
+from services.address_scheduler import AddressScheduler
+from services.address_stream import AddressStream
+
+WATCHED = "bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh"
+
+
+class FeedStandIn:
+    """A local stand-in for the mempool WebSocket feed."""
+
+    def __init__(self):
+        self.subscriptions = []
+        self.connections = 0
+        self.sockets = []
+
+    async def handle(self, request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.connections += 1
+        self.sockets.append(ws)
+        async for message in ws:
+            self.subscriptions.append(json.loads(message.data))
+        return ws
+
+    async def push(self, payload):
+        await self.sockets[-1].send_json(payload)
+
+
+async def wait_for(condition, timeout=2.0):
+    for _ in range(int(timeout / 0.01)):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+def test_pushed_transactions_reach_the_callback_and_stream_reconnects():
+    feed = FeedStandIn()
+    received = []
+    polls = []
+
+    async def fetch(address):
+        polls.append(address)
+        return []
+
+    async def callback(tx):
+        received.append(tx["txid"])
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/ws", feed.handle)
+        async with TestServer(app) as server:
+            scheduler = AddressScheduler(fetch, min_interval=0.05, max_interval=60)
+            stream = AddressStream(str(server.make_url("/ws")), scheduler, reconnect_min=0.05, reconnect_max=0.1)
+            scheduler.watch(WATCHED, callback)
+            await scheduler.start()
+            await stream.start()
+            try:
+                await wait_for(lambda: feed.subscriptions)
+                assert feed.subscriptions[-1] == {"track-addresses": [WATCHED]}
+                assert scheduler.push_active
+
+                tx = {"txid": "aa", "vout": [{"scriptpubkey_address": WATCHED, "value": 1000}]}
+                await feed.push({"multi-address-transactions": {WATCHED: {"mempool": [tx], "confirmed": []}}})
+                # The same transaction confirming is not delivered twice
+                await feed.push({"multi-address-transactions": {WATCHED: {"mempool": [], "confirmed": [tx]}}})
+                await feed.push({"block-transactions": [{"txid": "bb", "vout": tx["vout"]}]})
+                await wait_for(lambda: received == ["aa", "bb"])
+
+                # Drop the connection: polling takes over until the stream is back
+                polls.clear()
+                await feed.sockets[-1].close()
+                await wait_for(lambda: polls)
+                await wait_for(lambda: feed.connections == 2 and len(feed.subscriptions) == 2)
+                assert scheduler.push_active
+            finally:
+                await stream.stop()
+                await scheduler.stop()
+                await close_http_session()
+
+    asyncio.run(scenario())
+    assert received == ["aa", "bb"]
+
+
+def test_unreachable_feed_leaves_polling_in_charge():
+    polls = []
+
+    async def fetch(address):
+        polls.append(address)
+        return [{"txid": "cc"}]
+
+    async def noop(tx):
+        pass
+
+    async def scenario():
+        scheduler = AddressScheduler(fetch, min_interval=0.02, max_interval=60)
+        stream = AddressStream("http://127.0.0.1:9/ws", scheduler, reconnect_min=0.01, reconnect_max=0.02)
+        scheduler.watch(WATCHED, noop)
+        await scheduler.start()
+        await stream.start()
+        try:
+            await wait_for(lambda: len(polls) >= 2)
+            assert not stream.connected and not scheduler.push_active
+        finally:
+            await stream.stop()
+            await scheduler.stop()
+            await close_http_session()
+
+    asyncio.run(scenario())
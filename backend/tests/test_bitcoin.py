@@ -0,0 +1,47 @@
+import asyncio
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from unittest.mock import patch
+from infrastructure.http_client import close_http_session
+from services.bitcoin import verify_transaction
+from services.blockchain_providers import ProviderPool
+from services.transaction_monitor import TransactionMonitor
+from services.tx_cache import TransactionCache
+
+ADDRESS = "bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh"
+TX = {"status": {"confirmed": True}, "vout": [{"scriptpubkey_address": ADDRESS, "value": 2100}]}
+
+
+async def handle_tx(request):
+    if request.match_info["txid"] == "slow":
+        await asyncio.sleep(1)
+    return web.json_response(TX)
+
+
+async def verify_against_stub(*calls):
+    app = web.Application()
+    app.router.add_get("/tx/{txid}", handle_tx)
+    monitor = TransactionMonitor()
+    monitor.timeout = aiohttp.ClientTimeout(sock_connect=1, sock_read=0.2)
+    monitor.tx_cache = TransactionCache(path=None)
+    async with TestServer(app) as server:
+        monitor.providers = ProviderPool([str(server.make_url(""))])
+        try:
+            with patch("services.bitcoin.get_transaction_monitor", return_value=monitor):
+                return await asyncio.gather(*(verify_transaction(*call) for call in calls))
+        finally:
+            await close_http_session()
+
+
+def test_verify_transaction_checks_address_and_amount():
+    matched, wrong_amount = asyncio.run(verify_against_stub(("ok", ADDRESS, 2100), ("ok", ADDRESS, 1000)))
+    assert matched == {"verified": True, "amount": 2100}
+    assert wrong_amount["verified"] is False
+
+
+def test_slow_upstream_times_out_without_blocking_other_verifications():
+    slow, fast = asyncio.run(verify_against_stub(("slow", ADDRESS, 2100), ("ok", ADDRESS, 2100)))
+    assert slow["verified"] is False
+    assert "Timeout" in slow["error"]
+    assert fast["verified"] is True
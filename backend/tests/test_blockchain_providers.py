@@ -0,0 +1,127 @@
+import asyncio
+import time
+import aiohttp
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from infrastructure.http_client import close_http_session, get_http_session
+from services.blockchain_providers import ProviderPool, PROVIDER_FAILURE_THRESHOLD
+from services.rate_limit import CircuitOpenError
+
+
+def stub_app(name, delay=0.0, status=200):
+    """An Esplora-ish /tx endpoint that answers after `delay` seconds."""
+    calls = []
+
+    async def handle_tx(request):
+        calls.append(request.match_info["txid"])
+        await asyncio.sleep(delay)
+        if status != 200:
+            raise web.HTTPInternalServerError()
+        return web.json_response({"txid": request.match_info["txid"], "provider": name})
+
+    app = web.Application()
+    app.router.add_get("/tx/{txid}", handle_tx)
+    return app, calls
+
+
+async def fetch_tx(base_url):
+    async with get_http_session().get(f"{base_url}/tx/aa") as response:
+        response.raise_for_status()
+        return await response.json()
+
+
+def run_with_stubs(apps, scenario):
+    async def main():
+        servers = [TestServer(app) for app in apps]
+        for server in servers:
+            await server.start_server()
+        try:
+            return await scenario([str(server.make_url("")) for server in servers])
+        finally:
+            await close_http_session()
+            for server in servers:
+                await server.close()
+
+    return asyncio.run(main())
+
+
+def test_hedged_request_to_fast_provider_wins():
+    slow, slow_calls = stub_app("slow", delay=0.5)
+    fast, _ = stub_app("fast", delay=0.01)
+
+    async def scenario(urls):
+        pool = ProviderPool(urls)
+        pool.hedge_delay = lambda provider: 0.05
+        started = time.perf_counter()
+        first = await pool.request(fetch_tx)
+        elapsed = time.perf_counter() - started
+        # The slow provider lost the race, so the fast one is now preferred
+        second = await pool.request(fetch_tx)
+        return first, elapsed, second, pool
+
+    first, elapsed, second, pool = run_with_stubs([slow, fast], scenario)
+    assert first["provider"] == "fast"
+    assert elapsed < 0.4
+    assert second["provider"] == "fast"
+    assert len(slow_calls) == 1
+    assert pool.ranked()[0] is pool.providers[1]
+
+
+def test_without_hedging_requests_wait_for_the_primary():
+    slow, _ = stub_app("slow", delay=0.2)
+    fast, fast_calls = stub_app("fast")
+
+    async def scenario(urls):
+        return await ProviderPool(urls, hedge=False).request(fetch_tx)
+
+    assert run_with_stubs([slow, fast], scenario)["provider"] == "slow"
+    assert fast_calls == []
+
+
+def test_failing_provider_fails_over_and_cools_down():
+    broken, broken_calls = stub_app("broken", status=500)
+    healthy, _ = stub_app("healthy")
+
+    async def scenario(urls):
+        pool = ProviderPool(urls, hedge=False)
+        results = [await pool.request(fetch_tx) for _ in range(PROVIDER_FAILURE_THRESHOLD + 2)]
+        return results, pool
+
+    results, pool = run_with_stubs([broken, healthy], scenario)
+    assert all(result["provider"] == "healthy" for result in results)
+    broken_stats = pool.providers[0]
+    assert not broken_stats.healthy
+    # Once a provider is cooling down, requests stop reaching it
+    assert len(broken_calls) <= PROVIDER_FAILURE_THRESHOLD
+
+
+def test_all_providers_failing_raises_last_error():
+    first, _ = stub_app("first", status=500)
+    second, _ = stub_app("second", status=500)
+
+    async def scenario(urls):
+        try:
+            await ProviderPool(urls, hedge=False).request(fetch_tx)
+        except aiohttp.ClientResponseError as e:
+            return e.status
+
+    assert run_with_stubs([first, second], scenario) == 500
+
+
+def test_open_circuits_fail_fast_with_a_clear_error():
+    throttled, throttled_calls = stub_app("throttled", status=500)
+
+    async def scenario(urls):
+        pool = ProviderPool(urls, hedge=False)
+        errors = []
+        for _ in range(PROVIDER_FAILURE_THRESHOLD + 2):
+            try:
+                await pool.request(fetch_tx)
+            except Exception as e:
+                errors.append(e)
+        return errors
+
+    errors = run_with_stubs([throttled], scenario)
+    assert len(throttled_calls) == PROVIDER_FAILURE_THRESHOLD
+    assert isinstance(errors[-1], CircuitOpenError)
+    assert "circuit open" in str(errors[-1])
@@ -0,0 +1,99 @@
+import asyncio
+import pytest
+from infrastructure.cache import TTLCache
+from infrastructure.storage_engine import StorageEngine, set_storage_engine
+import cosmos_repository
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingEngine(StorageEngine):
+    """Engine that records how often each store is read"""
+
+    def __init__(self):
+        self.stores = {}
+        self.reads = 0
+
+    async def get_store(self, store_id):
+        self.reads += 1
+        store = self.stores.get(store_id)
+        return dict(store) if store else None
+
+    async def create_store(self, store_data):
+        self.stores[store_data["id"]] = dict(store_data)
+        return dict(store_data)
+
+    async def update_store(self, store_id, update_data):
+        if store_id not in self.stores:
+            return None
+        self.stores[store_id] = {**self.stores[store_id], **update_data}
+        return dict(self.stores[store_id])
+
+
+@pytest.fixture
+def engine():
+    engine = CountingEngine()
+    set_storage_engine(engine)
+    cosmos_repository.store_cache.clear()
+    yield engine
+    set_storage_engine(None)
+    cosmos_repository.store_cache.clear()
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = TTLCache(max_size=10, ttl=5, clock=clock)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    clock.now = 5
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = TTLCache(max_size=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert "a" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_set_if_unchanged_rejects_stale_reads():
+    cache = TTLCache(max_size=10, ttl=60)
+    generation = cache.generation
+    cache.invalidate("a")
+    assert cache.set_if_unchanged("a", "stale", generation) is False
+    assert "a" not in cache
+
+
+def test_get_store_reads_through_once(engine):
+    store = asyncio.run(cosmos_repository.create_store({"name": "Cached"}))
+    cosmos_repository.store_cache.clear()
+
+    for _ in range(3):
+        assert asyncio.run(cosmos_repository.get_store(store["id"]))["name"] == "Cached"
+    assert engine.reads == 1
+
+
+def test_writes_refresh_cached_store(engine):
+    store = asyncio.run(cosmos_repository.create_store({"name": "Before"}))
+    asyncio.run(cosmos_repository.update_store(store["id"], {"name": "After"}))
+
+    assert asyncio.run(cosmos_repository.get_store(store["id"]))["name"] == "After"
+    assert engine.reads == 0
+
+
+def test_cached_store_is_not_shared(engine):
+    store = asyncio.run(cosmos_repository.create_store({"name": "Original"}))
+    asyncio.run(cosmos_repository.get_store(store["id"]))["name"] = "Mutated"
+    assert asyncio.run(cosmos_repository.get_store(store["id"]))["name"] == "Original"
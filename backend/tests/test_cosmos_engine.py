@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+from azure.cosmos import exceptions
+from infrastructure.cosmos_engine import CosmosStorageEngine, MAX_CONFLICT_RETRIES
+from infrastructure.storage_engine import ConcurrentUpdateError
+
+STORE_ID = "123e4567-e89b-12d3-a456-426614174000"
+
+
+class FakeContainer:
+    """Just enough of an aio container to exercise the update paths"""
+
+    id = "fake"
+
+    def __init__(self, doc, conflicts=0):
+        self.doc = dict(doc, _etag="1")
+        self.conflicts = conflicts
+        self.calls = []
+
+    async def read_item(self, item, partition_key, response_hook=None):
+        self.calls.append("read")
+        return dict(self.doc)
+
+    async def patch_item(self, item, partition_key, patch_operations, response_hook=None):
+        self.calls.append("patch")
+        for op in patch_operations:
+            if op["path"].count("/") == 1:
+                self.doc[op["path"][1:]] = op["value"]
+        return dict(self.doc)
+
+    async def replace_item(self, item, body, partition_key, etag, match_condition, response_hook=None):
+        self.calls.append("replace")
+        if self.conflicts:
+            # Someone else wrote first
+            self.conflicts -= 1
+            self.doc["_etag"] = str(int(self.doc["_etag"]) + 1)
+        if etag != self.doc["_etag"]:
+            raise exceptions.CosmosAccessConditionFailedError(status_code=412, message="Precondition failed")
+        self.doc = dict(body, _etag=str(int(etag) + 1))
+        return dict(self.doc)
+
+
+def run_with(container, coro_factory):
+    resources = (None, None, container, container)
+    with patch("infrastructure.cosmos_engine.get_cosmos_resources", return_value=resources):
+        return asyncio.run(coro_factory(CosmosStorageEngine()))
+
+
+def test_update_store_is_a_single_patch():
+    container = FakeContainer({"id": STORE_ID, "name": "Old"})
+    updated = run_with(container, lambda e: e.update_store(STORE_ID, {"name": "New", "verified": True}))
+    assert updated["name"] == "New"
+    assert container.calls == ["patch"]
+
+
+def test_update_review_retries_on_etag_conflict():
+    review_id = f"{STORE_ID}_00000000-0000-4000-8000-000000000000"
+    container = FakeContainer({"id": review_id, "store_id": STORE_ID}, conflicts=2)
+    with patch.object(CosmosStorageEngine, "_apply_review_stats") as apply_stats:
+        updated = run_with(container, lambda e: e.update_review(review_id, {"verified": True}, STORE_ID))
+    assert updated["verified"] is True
+    assert container.calls.count("replace") == 3
+    apply_stats.assert_called_once()
+
+
+def test_update_review_gives_up_after_bounded_retries():
+    review_id = f"{STORE_ID}_00000000-0000-4000-8000-000000000000"
+    container = FakeContainer({"id": review_id, "store_id": STORE_ID}, conflicts=MAX_CONFLICT_RETRIES)
+    with pytest.raises(ConcurrentUpdateError):
+        run_with(container, lambda e: e.update_review(review_id, {"verified": True}, STORE_ID))
@@ -0,0 +1,21 @@
+import asyncio
+from infrastructure.http_client import get_http_session, close_http_session
+
+
+def test_session_is_shared_within_a_loop():
+    async def scenario():
+        first = get_http_session()
+        assert get_http_session() is first
+        await close_http_session()
+        assert first.closed
+        return first
+
+    first = asyncio.run(scenario())
+
+    async def new_loop():
+        session = get_http_session()
+        await close_http_session()
+        return session
+
+    # A session cannot be used from another event loop, so a new one is made
+    assert asyncio.run(new_loop()) is not first
@@ -0,0 +1,57 @@
+import asyncio
+from unittest.mock import patch
+import cosmos_repository
+from infrastructure.metrics import Histogram, metrics
+from infrastructure import storage_metrics
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_histogram_quantiles():
+    histogram = Histogram(buckets=(10, 100, 1000))
+    for value in [5] * 90 + [50] * 9 + [5000]:
+        histogram.observe(value)
+    assert histogram.quantile(0.5) == 10
+    assert histogram.quantile(0.95) == 100
+    assert histogram.quantile(1.0) == 5000
+    assert histogram.snapshot()["buckets"] == {"10": 90, "100": 9, "1000": 0, "+Inf": 1}
+
+
+def test_repository_calls_are_counted(sqlite_engine, test_store):
+    metrics.reset()
+    hits = cosmos_repository.store_cache.hits
+    store = run(cosmos_repository.create_store(dict(test_store)))
+    run(cosmos_repository.get_store(store["id"]))
+    run(cosmos_repository.get_store("missing"))
+
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"]["storage_calls_total"] == {"operation=create_store": 1, "operation=get_store": 2}
+    assert "storage_errors_total" not in snapshot["counters"]
+    items = snapshot["histograms"]["storage_items"]["operation=get_store"]
+    assert items["count"] == 2 and items["sum"] == 1
+    assert snapshot["store_cache"]["hits"] == hits + 1
+
+
+def test_failed_calls_are_counted(sqlite_engine):
+    metrics.reset()
+    with patch.object(sqlite_engine, "_get_reviews", side_effect=RuntimeError("boom")):
+        response = run(cosmos_repository.get_reviews("some-store"))
+    assert response.error == "boom"
+    assert metrics.snapshot()["counters"]["storage_errors_total"] == {"operation=get_reviews": 1}
+
+
+def test_slow_calls_are_logged_with_their_queries(sqlite_engine, test_store, client):
+    storage_metrics.slow_queries.clear()
+    with patch.object(storage_metrics, "SLOW_QUERY_THRESHOLD_MS", 0):
+        run(cosmos_repository.query_stores(category=test_store["category"]))
+
+    entry = storage_metrics.slow_queries[-1]
+    assert entry["operation"] == "query_stores"
+    assert entry["items"] == 0
+    assert any("FROM stores" in query for query in entry["queries"])
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.json()["slow_queries"]["recent"][-1]["operation"] == "query_stores"
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from services.rate_limit import CircuitBreaker, CircuitOpenError, RateLimitExceeded, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_token_bucket_allows_burst_then_spaces_calls():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, max_waiters=10, clock=clock, sleep=clock.sleep)
+
+    async def scenario():
+        return [await bucket.acquire() for _ in range(5)]
+
+    waits = asyncio.run(scenario())
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.5)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_rejects_when_queue_is_full():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=1, max_waiters=1, clock=clock)
+
+    async def scenario():
+        await bucket.acquire()
+        waiter = asyncio.ensure_future(bucket.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimitExceeded):
+            await bucket.acquire()
+        waiter.cancel()
+
+    asyncio.run(scenario())
+    assert bucket.rejected == 1
+
+
+def test_circuit_breaker_opens_probes_and_closes():
+    clock = FakeClock()
+    breaker = CircuitBreaker("stub", failure_threshold=2, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 10
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now = 20
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_retry_after_keeps_circuit_open_longer():
+    clock = FakeClock()
+    breaker = CircuitBreaker("stub", failure_threshold=5, reset_timeout=10, clock=clock)
+    breaker.record_failure(retry_after=60)
+    clock.now = 30
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now = 60
+    assert breaker.state == CircuitBreaker.HALF_OPEN
@@ -0,0 +1,131 @@
+import asyncio
+import uuid
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from infrastructure.review_ids import store_id_from_review_id
+import cosmos_repository
+
+client = TestClient(app)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_wal_mode(sqlite_engine):
+    mode = sqlite_engine._conn.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def test_store_roundtrip(sqlite_engine, test_store):
+    created = run(cosmos_repository.create_store(dict(test_store)))
+    assert "id" in created
+    assert created["created_at"] == created["updated_at"]
+
+    fetched = run(cosmos_repository.get_store(created["id"]))
+    assert fetched == created
+
+    updated = run(cosmos_repository.update_store(created["id"], {"verified": True, "name": "Renamed"}))
+    assert updated["verified"] is True
+    assert updated["name"] == "Renamed"
+    assert updated["description"] == test_store["description"]
+
+    assert run(cosmos_repository.get_stores()) == [updated]
+    assert run(cosmos_repository.get_store("missing")) is None
+    assert run(cosmos_repository.update_store("missing", {"name": "x"})) is None
+
+
+def test_review_roundtrip(sqlite_engine, test_store, test_review):
+    store = run(cosmos_repository.create_store(dict(test_store)))
+    other = run(cosmos_repository.create_store(dict(test_store)))
+
+    response = run(cosmos_repository.create_review({**test_review, "store_id": store["id"]}))
+    assert response.error is None
+    review = response.data
+    run(cosmos_repository.create_review({**test_review, "store_id": other["id"]}))
+
+    assert run(cosmos_repository.get_reviews(store["id"])).data == [review]
+    assert len(run(cosmos_repository.get_reviews(None)).data) == 2
+
+    response = run(cosmos_repository.update_review(review["id"], {"verified": True}))
+    assert response.data["verified"] is True
+    assert run(cosmos_repository.get_reviews(store["id"])).data[0]["verified"] is True
+
+    assert run(cosmos_repository.update_review("missing", {"verified": True})).error == "Review not found"
+
+
+def test_routers_use_configured_engine(sqlite_engine, test_store):
+    store = run(cosmos_repository.create_store({**test_store, "verified": False}))
+
+    response = client.get("/api/stores")
+    assert response.status_code == 200
+    assert [s["id"] for s in response.json()] == [store["id"]]
+
+    response = client.get(f"/api/stores/{store['id']}")
+    assert response.status_code == 200
+    assert response.json()["name"] == test_store["name"]
+
+
+def test_search_pages_with_continuation_token(sqlite_engine, test_store):
+    for i in range(5):
+        run(cosmos_repository.create_store({**test_store, "name": f"Store {i}", "verified": i % 2 == 0}))
+    run(cosmos_repository.create_store({**test_store, "category": "Other", "verified": True}))
+
+    response = client.get("/api/stores/search?category=Test Category&verified=true&limit=2")
+    assert response.status_code == 200
+    assert [s["name"] for s in response.json()] == ["Store 0", "Store 2"]
+    token = response.headers["X-Continuation-Token"]
+
+    response = client.get(f"/api/stores/search?category=Test Category&verified=true&limit=2&continuation_token={token}")
+    assert response.status_code == 200
+    assert [s["name"] for s in response.json()] == ["Store 4"]
+    assert "X-Continuation-Token" not in response.headers
+
+    response = client.get("/api/stores/search?continuation_token=bogus")
+    assert response.status_code == 400
+
+
+def test_review_aggregates_follow_writes(sqlite_engine, test_store, test_review):
+    store = run(cosmos_repository.create_store(dict(test_store)))
+    first = run(cosmos_repository.create_review({**test_review, "store_id": store["id"], "rating": 5})).data
+    run(cosmos_repository.create_review({**test_review, "store_id": store["id"], "rating": 2}))
+    run(cosmos_repository.update_review(first["id"], {"verified": True}))
+
+    response = client.get(f"/api/stores/{store['id']}/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_reviews"] == 2
+    assert data["average_rating"] == 3.5
+    assert data["verified_reviews"] == 1
+    assert data["rating_histogram"] == {"1": 0, "2": 1, "3": 0, "4": 0, "5": 1}
+
+    incremental = run(cosmos_repository.get_store(store["id"]))["review_stats"]
+    assert run(cosmos_repository.rebuild_review_stats(store["id"])) == incremental
+
+
+def test_stats_backfills_legacy_store(sqlite_engine, test_store, test_review):
+    store = run(cosmos_repository.create_store(dict(test_store)))
+    run(cosmos_repository.create_review({**test_review, "store_id": store["id"], "rating": 4}))
+    run(cosmos_repository.update_store(store["id"], {"review_stats": None}))
+
+    response = client.get(f"/api/stores/{store['id']}/stats")
+    assert response.json()["total_reviews"] == 1
+    assert run(cosmos_repository.get_store(store["id"]))["review_stats"]["rating_sum"] == 4
+
+
+def test_review_ids_resolve_without_scanning(sqlite_engine, test_store, test_review):
+    store = run(cosmos_repository.create_store(dict(test_store)))
+    review = run(cosmos_repository.create_review({**test_review, "store_id": store["id"]})).data
+    assert store_id_from_review_id(review["id"]) == store["id"]
+
+    response = client.get(f"/api/reviews/{review['id']}")
+    assert response.status_code == 200
+    assert response.json()["id"] == review["id"]
+
+    # Legacy ids carry no store_id and still resolve
+    legacy = run(cosmos_repository.create_review({**test_review, "id": str(uuid.uuid4()), "store_id": store["id"]})).data
+    assert store_id_from_review_id(legacy["id"]) is None
+    assert client.get(f"/api/reviews/{legacy['id']}").status_code == 200
+
+    assert client.get(f"/api/reviews/{store['id']}_{uuid.uuid4()}").status_code == 404
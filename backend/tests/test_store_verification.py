@@ -1,6 +1,6 @@
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch
+from unittest.mock import patch, AsyncMock
 import sys
 import os
 
@@ -37,18 +37,18 @@ MOCK_VERIFICATION_FAILURE = {
 
 @pytest.fixture
 def mock_get_store():
-    with patch("routers.stores.get_store") as mock:
+    with patch("routers.stores.get_store", new_callable=AsyncMock) as mock:
         mock.return_value = MOCK_STORE
         yield mock
 
 @pytest.fixture
 def mock_verify_transaction():
-    with patch("routers.stores.verify_transaction") as mock:
+    with patch("routers.stores.verify_transaction", new_callable=AsyncMock) as mock:
         yield mock
 
 @pytest.fixture
 def mock_update_store():
-    with patch("routers.stores.update_store") as mock:
+    with patch("routers.stores.update_store", new_callable=AsyncMock) as mock:
         mock.return_value = {**MOCK_STORE, "verified": True, "verification_txid": "test_txid", "verification_amount": 10000}
         yield mock
 
@@ -0,0 +1,63 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from infrastructure.http_client import close_http_session
+from infrastructure.metrics import metrics
+from services.blockchain_providers import ProviderPool
+from services.transaction_monitor import TransactionMonitor
+from services.tx_cache import TransactionCache
+
+TX = {"txid": "aa", "status": {"confirmed": False}, "vout": []}
+
+
+def run_against_stub(handler, scenario):
+    async def main():
+        app = web.Application()
+        app.router.add_get("/tx/{txid}", handler)
+        monitor = TransactionMonitor()
+        monitor.tx_cache = TransactionCache(path=None, unconfirmed_ttl=0)
+        async with TestServer(app) as server:
+            monitor.providers = ProviderPool([str(server.make_url(""))])
+            try:
+                return await scenario(monitor)
+            finally:
+                await close_http_session()
+
+    return asyncio.run(main())
+
+
+def test_concurrent_lookups_share_one_upstream_call():
+    upstream_calls = []
+
+    async def handle_tx(request):
+        upstream_calls.append(request.match_info["txid"])
+        await asyncio.sleep(0.1)
+        return web.json_response(TX)
+
+    async def scenario(monitor):
+        results = await asyncio.gather(*(monitor.fetch_transaction("aa") for _ in range(10)))
+        # Each caller gets its own copy
+        results[0]["vout"].append("mutated")
+        return results
+
+    metrics.reset()
+    results = run_against_stub(handle_tx, scenario)
+    assert upstream_calls == ["aa"]
+    assert results[1] == TX
+    counters = metrics.snapshot()["counters"]
+    assert counters["mempool_upstream_requests_total"] == {"": 1}
+    assert counters["mempool_coalesced_lookups_total"] == {"": 9}
+
+
+def test_upstream_errors_reach_every_waiter_and_are_not_sticky():
+    async def handle_tx(request):
+        await asyncio.sleep(0.05)
+        raise web.HTTPNotFound()
+
+    async def scenario(monitor):
+        results = await asyncio.gather(*(monitor.fetch_transaction("aa") for _ in range(3)), return_exceptions=True)
+        assert not monitor._inflight
+        return results
+
+    results = run_against_stub(handle_tx, scenario)
+    assert all(getattr(result, "status", None) == 404 for result in results)
@@ -0,0 +1,66 @@
+import asyncio
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from infrastructure.http_client import close_http_session
+from services.blockchain_providers import ProviderPool
+from services.transaction_monitor import TransactionMonitor
+from services.tx_cache import TransactionCache
+
+CONFIRMED = {"txid": "aa", "status": {"confirmed": True}, "vout": []}
+UNCONFIRMED = {"txid": "bb", "status": {"confirmed": False}, "vout": []}
+
+
+def test_confirmed_transactions_survive_restart(tmp_path):
+    path = str(tmp_path / "tx.db")
+
+    async def scenario():
+        cache = TransactionCache(path=path)
+        await cache.set("aa", CONFIRMED)
+        await cache.close()
+
+        reopened = TransactionCache(path=path)
+        assert await reopened.get("aa") == CONFIRMED
+        assert await reopened.get("aa") == CONFIRMED
+        await reopened.close()
+        return reopened.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["disk_hits"] == 1 and stats["memory_hits"] == 1
+
+
+def test_unconfirmed_transactions_expire_and_stay_off_disk(tmp_path):
+    async def scenario():
+        cache = TransactionCache(path=str(tmp_path / "tx.db"), unconfirmed_ttl=0)
+        await cache.set("bb", UNCONFIRMED)
+        result = await cache.get("bb")
+        await cache.close()
+        return result
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_repeat_lookups_do_not_leave_the_process(tmp_path):
+    upstream_calls = []
+
+    async def handle_tx(request):
+        upstream_calls.append(request.match_info["txid"])
+        return web.json_response(CONFIRMED)
+
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/tx/{txid}", handle_tx)
+        monitor = TransactionMonitor()
+        monitor.tx_cache = TransactionCache(path=str(tmp_path / "tx.db"))
+        async with TestServer(app) as server:
+            monitor.providers = ProviderPool([str(server.make_url(""))])
+            try:
+                for _ in range(3):
+                    assert await monitor.get_transaction("aa") == CONFIRMED
+            finally:
+                await close_http_session()
+                await monitor.tx_cache.close()
+        return monitor.tx_cache.stats()
+
+    stats = asyncio.run(scenario())
+    assert upstream_calls == ["aa"]
+    assert stats["memory_hits"] == 2 and stats["misses"] == 1
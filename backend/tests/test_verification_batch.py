@@ -0,0 +1,62 @@
+import asyncio
+import json
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from main import app
+from routers import verification
+
+client = TestClient(app)
+
+ADDRESS = "bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh"
+
+
+def txid(n):
+    return f"{n:064x}"
+
+
+def test_batch_streams_results_as_they_complete():
+    in_flight = []
+    peak = []
+
+    async def fake_verify(tx, address, amount=None):
+        in_flight.append(tx)
+        peak.append(len(in_flight))
+        # The first item is the slowest, so it should come back last
+        await asyncio.sleep(0.2 if tx == txid(0) else 0.01)
+        in_flight.remove(tx)
+        return {"verified": True, "amount": amount, "txid": tx}
+
+    items = [{"txid": txid(n), "address": ADDRESS, "amount": 1000} for n in range(6)]
+    with patch.object(verification.transaction_monitor, "verify_review_transaction", side_effect=fake_verify):
+        response = client.post("/api/verifications/batch", json={"items": items, "concurrency": 3})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(result["index"] for result in results) == list(range(6))
+    assert results[-1]["index"] == 0
+    assert all(result["verified"] for result in results)
+    assert max(peak) <= 3
+
+
+def test_batch_reports_per_item_failures():
+    async def fake_verify(tx, address, amount):
+        if tx == txid(1):
+            raise RuntimeError("boom")
+        return {"verified": False, "error": "Transaction not confirmed yet"}
+
+    items = [{"txid": txid(n), "address": ADDRESS, "amount": 1000, "kind": "store"} for n in range(2)]
+    with patch.object(verification.transaction_monitor, "verify_store_transaction", side_effect=fake_verify):
+        response = client.post("/api/verifications/batch", json={"items": items})
+
+    results = {result["index"]: result for result in map(json.loads, response.text.splitlines())}
+    assert results[0]["error"] == "Transaction not confirmed yet"
+    assert results[1] == {"index": 1, "txid": txid(1), "kind": "store", "verified": False, "error": "boom"}
+
+
+def test_batch_validates_items():
+    response = client.post(
+        "/api/verifications/batch",
+        json={"items": [{"txid": txid(0), "address": ADDRESS, "kind": "store"}]},
+    )
+    assert response.status_code == 422
@@ -0,0 +1,98 @@
+import asyncio
+from unittest.mock import patch
+import cosmos_repository
+from services.verification_jobs import VerificationJobQueue, VERIFIED, FAILED, EXPIRED, PENDING
+
+TXID = "ab" * 32
+NOT_CONFIRMED = {"verified": False, "error": "Transaction not confirmed yet", "pending": True}
+
+
+class FakeMonitor:
+    """Returns the scripted results in order, then the last one forever."""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+
+    async def _next(self, *args):
+        self.calls += 1
+        return self.results.pop(0) if len(self.results) > 1 else self.results[0]
+
+    verify_store_transaction = _next
+    verify_review_transaction = _next
+
+
+def run_queue(queue, submit, until):
+    async def scenario():
+        await queue.start()
+        try:
+            job = submit(queue)
+            for _ in range(200):
+                if until(job):
+                    break
+                await asyncio.sleep(0.01)
+            return job
+        finally:
+            await queue.stop()
+
+    return asyncio.run(scenario())
+
+
+def test_store_is_verified_once_the_transaction_confirms(sqlite_engine, test_store):
+    store = asyncio.run(cosmos_repository.create_store(dict(test_store)))
+    monitor = FakeMonitor(NOT_CONFIRMED, NOT_CONFIRMED, {"verified": True, "amount": 2100, "txid": TXID})
+    queue = VerificationJobQueue(monitor=monitor, workers=2, recheck_interval=0.01)
+
+    job = run_queue(
+        queue,
+        lambda q: q.submit("store", store["id"], TXID, store["btc_address"], 2100),
+        lambda job: job.status != PENDING,
+    )
+
+    assert job.status == VERIFIED
+    assert job.attempts == 3
+    updated = asyncio.run(cosmos_repository.get_store(store["id"]))
+    assert updated["verified"] is True
+    assert updated["verification_txid"] == TXID
+    assert updated["verification_amount"] == 2100
+
+
+def test_resubmitting_joins_the_pending_job():
+    queue = VerificationJobQueue(monitor=FakeMonitor(NOT_CONFIRMED))
+    first = queue.submit("review", "r1", TXID, "addr")
+    assert queue.submit("review", "r1", TXID, "addr") is first
+    assert queue.get(first.id) is first
+
+
+def test_definitive_failures_and_expiry():
+    failed = run_queue(
+        VerificationJobQueue(monitor=FakeMonitor({"verified": False, "error": "No valid payment found"})),
+        lambda q: q.submit("review", "r1", TXID, "addr"),
+        lambda job: job.status != PENDING,
+    )
+    assert failed.status == FAILED
+    assert failed.error == "No valid payment found"
+
+    expired = run_queue(
+        VerificationJobQueue(monitor=FakeMonitor(NOT_CONFIRMED), max_age=0),
+        lambda q: q.submit("review", "r2", TXID, "addr"),
+        lambda job: job.status != PENDING,
+    )
+    assert expired.status == EXPIRED
+
+
+def test_job_endpoints(sqlite_engine, test_store, client):
+    store = asyncio.run(cosmos_repository.create_store({**test_store, "verification_amount": 2100}))
+    queue = VerificationJobQueue(monitor=FakeMonitor(NOT_CONFIRMED))
+    with patch("routers.verification.get_verification_queue", return_value=queue):
+        response = client.post(
+            "/api/verifications/jobs", json={"kind": "store", "target_id": store["id"], "txid": TXID}
+        )
+        assert response.status_code == 202
+        job = response.json()
+        assert job["status"] == PENDING
+
+        assert client.get(f"/api/verifications/jobs/{job['id']}").json()["id"] == job["id"]
+        assert client.get("/api/verifications/jobs/missing").status_code == 404
+        missing = client.post("/api/verifications/jobs", json={"kind": "store", "target_id": "nope", "txid": TXID})
+        assert missing.status_code == 404